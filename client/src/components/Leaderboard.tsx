@@ -2,13 +2,15 @@ import React, { useState, useEffect } from 'react';
 import axios from 'axios';
 import '../styles.scss';
 import './LeaderboardStyles.scss'
-import { LeaderboardEntry, Puzzle } from '../utils/types';
+import { CompactPuzzle, LeaderboardEntry, Puzzle } from '../utils/types';
+import { COMPACT_PUZZLE_TYPE, decodePuzzle } from '../utils/puzzleEncoding';
 
 const Leaderboard = () => {
   const [leaderboard, setLeaderboard] = useState<LeaderboardEntry[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [selectedPuzzle, setSelectedPuzzle] = useState('all');
+  const [selectedWindow, setSelectedWindow] = useState('all');
   const [puzzles, setPuzzles] = useState<Puzzle[]>([]);
 
   useEffect(() => {
@@ -18,14 +20,26 @@ const Leaderboard = () => {
 
   useEffect(() => {
     fetchLeaderboard();
-  }, [selectedPuzzle]);
+
+    // The server pushes the board whenever it changes, so there is no need to poll
+    const params = selectedPuzzle === 'all'
+      ? `window=${selectedWindow}`
+      : `window=${selectedWindow}&puzzle_id=${selectedPuzzle}`;
+    const stream = new EventSource(`${axios.defaults.baseURL}/leaderboard/stream?${params}`);
+    stream.onmessage = (event) => {
+      setLeaderboard(JSON.parse(event.data).entries);
+    };
+    return () => stream.close();
+  }, [selectedPuzzle, selectedWindow]);
 
   const fetchPuzzles = async () => {
     try {
       const token = localStorage.getItem('token');
-      const headers = token ? { Authorization: `Bearer ${token}` } : {};
-      const response = await axios.get('/puzzles', { headers });
-      setPuzzles(response.data);
+      const headers = token
+        ? { Authorization: `Bearer ${token}`, Accept: COMPACT_PUZZLE_TYPE }
+        : { Accept: COMPACT_PUZZLE_TYPE };
+      const response = await axios.get<CompactPuzzle[]>('/puzzles', { headers });
+      setPuzzles(response.data.map(decodePuzzle));
     } catch (error) {
       setError('Failed to load puzzles');
     }
@@ -37,8 +51,8 @@ const Leaderboard = () => {
       const token = localStorage.getItem('token');
       const headers = token ? { Authorization: `Bearer ${token}` } : {};
       const url = selectedPuzzle === 'all' 
-        ? '/leaderboard' 
-        : `/leaderboard?puzzle_id=${selectedPuzzle}`;
+        ? `/leaderboard?window=${selectedWindow}` 
+        : `/leaderboard?window=${selectedWindow}&puzzle_id=${selectedPuzzle}`;
       
       const response = await axios.get(url, { headers });
       setLeaderboard(response.data);
@@ -95,6 +109,19 @@ const Leaderboard = () => {
             </option>
           ))}
         </select>
+        <label htmlFor="window-select" className="label-text">
+          Period:
+        </label>
+        <select
+          id="window-select"
+          value={selectedWindow}
+          onChange={(e) => setSelectedWindow(e.target.value)}
+          className="select-input"
+        >
+          <option value="daily">Today</option>
+          <option value="weekly">This Week</option>
+          <option value="all">All Time</option>
+        </select>
       </div>
 
       {error && (
@@ -2,7 +2,8 @@ import React, { useState, useEffect, useCallback } from 'react';
 import { useParams, Link } from 'react-router-dom';
 import './MazeGameStyles.scss';
 import '../styles.scss';
-import { Move, Puzzle } from '../utils/types';
+import { CompactPuzzle, Move, Puzzle } from '../utils/types';
+import { COMPACT_PUZZLE_TYPE, decodePuzzle } from '../utils/puzzleEncoding';
 import axios from 'axios';
 
 const MazeGame = () => {
@@ -61,10 +62,13 @@ const MazeGame = () => {
   const fetchPuzzle = async () => {
     try {
       const token = localStorage.getItem('token');
-      const headers = token ? { Authorization: `Bearer ${token}` } : {};
-      const response = await axios.get(`/puzzles/${id}`, { headers });
-      setPuzzle(response.data);
-      setPlayerPos(response.data.start_pos);
+      const headers = token
+        ? { Authorization: `Bearer ${token}`, Accept: COMPACT_PUZZLE_TYPE }
+        : { Accept: COMPACT_PUZZLE_TYPE };
+      const response = await axios.get<CompactPuzzle>(`/puzzles/${id}`, { headers });
+      const puzzle = decodePuzzle(response.data);
+      setPuzzle(puzzle);
+      setPlayerPos(puzzle.start_pos);
       setLoading(false);
     } catch (error) {
       setMessage('Failed to load puzzle');
@@ -3,7 +3,8 @@ import { Link } from 'react-router-dom';
 import './PuzzleListStyles.scss';
 import '../styles.scss';
 import axios from 'axios';
-import { Puzzle } from '../utils/types';
+import { CompactPuzzle, Puzzle } from '../utils/types';
+import { COMPACT_PUZZLE_TYPE, decodePuzzle } from '../utils/puzzleEncoding';
 
 const PuzzleList = () => {
   const [puzzles, setPuzzles] = useState<Puzzle[]>([]);
@@ -16,8 +17,10 @@ const PuzzleList = () => {
 
   const fetchPuzzles = async () => {
     try {
-      const response = await axios.get('/puzzles');
-      setPuzzles(response.data);
+      const response = await axios.get<CompactPuzzle[]>('/puzzles?sort=difficulty', {
+        headers: { Accept: COMPACT_PUZZLE_TYPE }
+      });
+      setPuzzles(response.data.map(decodePuzzle));
     } catch (error) {
       setError('Failed to load puzzles. Please try again.');
     } finally {
@@ -25,18 +28,13 @@ const PuzzleList = () => {
     }
   };
 
-  const getDifficultyColor = (difficulty: number) => {
-    if (difficulty == 5) return '#4CAF50'; // Easy - Green
-    if (difficulty == 6) return '#FF9800'; // Medium - Orange
+  // Labels come from the server's difficulty bands (src/difficulty.py)
+  const getDifficultyColor = (label: string) => {
+    if (label === 'Easy') return '#4CAF50'; // Green
+    if (label === 'Medium') return '#FF9800'; // Orange
     return '#F44336'; // Hard - Red
   };
 
-  const getDifficultyText = (difficulty: number) => {
-    if (difficulty == 5) return 'Easy';
-    if (difficulty == 6) return 'Medium';
-    return 'Hard';
-  };
-
   if (loading) {
     return (
       <div className="loading-container">
@@ -68,11 +66,11 @@ const PuzzleList = () => {
               <span>Size: {puzzle.grid.length}x{puzzle.grid[0].length}</span>
               <span 
                 style={{ 
-                  color: getDifficultyColor(puzzle.difficulty),
+                  color: getDifficultyColor(puzzle.difficulty_label),
                   fontWeight: 'bold'
                 }}
               >
-                {getDifficultyText(puzzle.difficulty)}
+                {puzzle.difficulty_label}
               </span>
             </div>
 
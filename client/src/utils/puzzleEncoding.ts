@@ -0,0 +1,38 @@
+import { CompactPuzzle, Puzzle } from './types';
+
+export const COMPACT_PUZZLE_TYPE = 'application/vnd.maze.compact+json';
+
+export const decodePuzzle = (compact: CompactPuzzle): Puzzle => {
+  const cells: string[] = [];
+  for (const [, count, code] of compact.cells.matchAll(/(\d*)(\D)/g)) {
+    const runLength = count ? parseInt(count) : 1;
+    for (let i = 0; i < runLength; i++) {
+      cells.push(code);
+    }
+  }
+
+  const grid: string[][] = [];
+  for (let r = 0; r < compact.rows; r++) {
+    grid.push(cells.slice(r * compact.cols, (r + 1) * compact.cols));
+  }
+
+  const portal_pairs: Record<number, Array<[number, number]>> = {};
+  for (let i = 0; i < compact.portals.length; i += 5) {
+    const [id, r1, c1, r2, c2] = compact.portals.slice(i, i + 5);
+    grid[r1][c1] = `P${id}`;
+    grid[r2][c2] = `P${id}`;
+    portal_pairs[id] = [[r1, c1], [r2, c2]];
+  }
+
+  return {
+    id: compact.id,
+    name: compact.name,
+    description: compact.description,
+    difficulty: compact.difficulty,
+    difficulty_label: compact.difficulty_label,
+    grid,
+    start_pos: compact.start_pos,
+    end_pos: compact.end_pos,
+    portal_pairs,
+  };
+};
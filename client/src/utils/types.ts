@@ -3,6 +3,7 @@ export type Puzzle = {
     name: string;
     description: string;
     difficulty: number;
+    difficulty_label: string;
     id: number;
     end_pos: [number, number];
     start_pos: [number, number];
@@ -20,4 +21,18 @@ export type LeaderboardEntry = {
 export type Move = {
     action: string;
     timestamp: number;
-}
\ No newline at end of file
+}
+// Wire format sent for Accept: application/vnd.maze.compact+json
+export type CompactPuzzle = {
+    id: number;
+    name: string;
+    description: string;
+    difficulty: number;
+    difficulty_label: string;
+    rows: number;
+    cols: number;
+    cells: string; // Run-length encoded cells, row by row: "3.#2K" = . . . # K K
+    start_pos: [number, number];
+    end_pos: [number, number];
+    portals: number[]; // Flat [id, row1, col1, row2, col2, ...]
+}
@@ -0,0 +1,193 @@
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import update
+
+from database import SessionLocal, Attempt, Puzzle
+from logic import validate_maze_solution, shortest_solution_length
+from models import MoveRequest
+
+# Fastest gap (ms) a human can plausibly leave between two key presses
+MIN_MOVE_INTERVAL_MS = int(os.getenv("ANTICHEAT_MIN_MOVE_INTERVAL_MS", "40"))
+# Fastest average pace (ms per move) accepted over a puzzle's optimal solution
+PAR_MS_PER_MOVE = int(os.getenv("ANTICHEAT_PAR_MS_PER_MOVE", "120"))
+# Maximum number of attempts analyzed and updated in one batch
+BATCH_SIZE = int(os.getenv("ANTICHEAT_BATCH_SIZE", "200"))
+# Seconds between sweeps for attempts left unanalyzed by a restart or a failed batch
+SWEEP_INTERVAL_SECONDS = float(os.getenv("ANTICHEAT_SWEEP_SECONDS", "300"))
+
+def analyze_attempt(puzzle: Puzzle, actions: List[str], timestamps: Optional[List[int]],
+                    completion_time: Optional[float] = None) -> Optional[str]:
+    """
+    Replay an attempt and decide whether it looks suspicious.
+    
+    Args:
+        puzzle: Puzzle the attempt was made against
+        actions: Move strings ('up', 'down', 'left', 'right')
+        timestamps: Client timestamps in milliseconds, one per move. None for
+            attempts stored before timestamps were recorded; those skip the
+            interval checks and use completion_time for the par check.
+        completion_time: Stored completion time in milliseconds, used when timestamps is None
+        
+    Returns:
+        The reason the attempt was flagged, or None if it looks legitimate
+    """
+    if timestamps is not None and len(timestamps) != len(actions):
+        return "Move timestamps don't match the moves"
+    
+    moves = [
+        MoveRequest(action=action, timestamp=timestamp)
+        for action, timestamp in zip(actions, timestamps if timestamps is not None else [0] * len(actions))
+    ]
+    is_valid, _ = validate_maze_solution(puzzle.grid, puzzle.start_pos, puzzle.end_pos, puzzle.portal_pairs, moves)
+    if not is_valid:
+        return "Replay does not reach the goal"
+    
+    if timestamps is not None:
+        for i in range(1, len(timestamps)):
+            interval = timestamps[i] - timestamps[i - 1]
+            if interval < 0:
+                return f"Non-monotonic timestamp at step {i + 1}"
+            if interval < MIN_MOVE_INTERVAL_MS:
+                return f"Impossible interval of {interval}ms at step {i + 1}"
+        completion_time = timestamps[-1] - timestamps[0]
+    
+    optimal_moves = getattr(puzzle, "optimal_moves", None)
+    if optimal_moves is None:
+        optimal_moves = shortest_solution_length(puzzle.grid, puzzle.start_pos, puzzle.end_pos, puzzle.portal_pairs)
+    if optimal_moves is not None and completion_time is not None:
+        par_time = (optimal_moves - 1) * PAR_MS_PER_MOVE
+        if completion_time < par_time:
+            return f"Completion time {completion_time}ms is below par of {par_time}ms"
+    
+    return None
+
+def analyze_batch(db, attempt_ids: List[int]) -> int:
+    """Analyze the given attempts and mark them in bulk. Returns the number flagged."""
+    attempts = db.query(Attempt).filter(Attempt.id.in_(attempt_ids), Attempt.analyzed_at.is_(None)).all()
+    if not attempts:
+        return 0
+    
+    puzzle_ids = {attempt.puzzle_id for attempt in attempts}
+    puzzles = {puzzle.id: puzzle for puzzle in db.query(Puzzle).filter(Puzzle.id.in_(puzzle_ids))}
+    
+    flagged = {}
+    for attempt in attempts:
+        if not attempt.is_valid:
+            continue
+        reason = analyze_attempt(
+            puzzles[attempt.puzzle_id], attempt.moves, attempt.move_timestamps, attempt.completion_time
+        )
+        if reason:
+            flagged[attempt.id] = reason
+    
+    now = datetime.utcnow()
+    db.execute(
+        update(Attempt)
+        .where(Attempt.id.in_([attempt.id for attempt in attempts]))
+        .values(analyzed_at=now)
+    )
+    for reason in set(flagged.values()):
+        ids = [attempt_id for attempt_id, r in flagged.items() if r == reason]
+        db.execute(
+            update(Attempt)
+            .where(Attempt.id.in_(ids))
+            .values(is_flagged=True, flag_reason=reason)
+        )
+    db.commit()
+    return len(flagged)
+
+def analyze_pending(db) -> int:
+    """Analyze every attempt not yet replayed, e.g. ones queued before a restart. Returns the number flagged."""
+    total = 0
+    while True:
+        ids = [row.id for row in db.query(Attempt.id).filter(Attempt.analyzed_at.is_(None)).limit(BATCH_SIZE)]
+        if not ids:
+            return total
+        total += analyze_batch(db, ids)
+
+class AttemptAnalyzer:
+    """Background worker that replays newly submitted attempts off the request path"""
+
+    def __init__(self, session_factory=None, batch_size: int = BATCH_SIZE,
+                 sweep_interval: float = SWEEP_INTERVAL_SECONDS):
+        self.session_factory = session_factory or (lambda: SessionLocal(use_primary=True))
+        self.batch_size = batch_size
+        self.sweep_interval = sweep_interval
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def submit(self, attempt_id: int):
+        """Queue an attempt for analysis; never blocks the caller"""
+        self._queue.put(attempt_id)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="attempt-analyzer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _next_batch(self, timeout: float) -> Optional[List[int]]:
+        """
+        Wait up to timeout for one attempt id, then drain up to batch_size without waiting.
+        None means stop; an empty list means the wait timed out.
+        """
+        try:
+            first = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return []
+        if first is None:
+            return None
+        batch = [first]
+        while len(batch) < self.batch_size:
+            try:
+                attempt_id = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if attempt_id is None:
+                self._queue.put(None)
+                break
+            batch.append(attempt_id)
+        return batch
+
+    def _analyze(self, work, description: str):
+        db = None
+        try:
+            db = self.session_factory()
+            work(db)
+        except Exception as e:
+            # The attempts stay unanalyzed and the next sweep retries them
+            if db is not None:
+                db.rollback()
+            print(f"Anti-cheat {description} failed: {e}")
+        finally:
+            if db is not None:
+                db.close()
+
+    def _run(self):
+        next_sweep = 0.0
+        while True:
+            if time.monotonic() >= next_sweep:
+                self._analyze(analyze_pending, "sweep")
+                next_sweep = time.monotonic() + self.sweep_interval
+            batch = self._next_batch(max(0.0, next_sweep - time.monotonic()))
+            if batch is None:
+                return
+            if batch:
+                self._analyze(lambda db: analyze_batch(db, batch), f"analysis of {len(batch)} attempts")
+
+analyzer = AttemptAnalyzer()
+
+if __name__ == "__main__":
+    db = SessionLocal(use_primary=True)
+    print(f"Flagged {analyze_pending(db)} attempts")
+    db.close()
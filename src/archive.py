@@ -0,0 +1,187 @@
+import argparse
+import gzip
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Iterator, Optional
+
+from database import SessionLocal, Attempt, engine, ensure_partitions, month_start
+
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "attempt_archive")
+# Invalid attempts older than this many days are moved out of the attempts table
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "30"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "5000"))
+# How often the maintenance thread creates partitions and archives attempts
+MAINTENANCE_INTERVAL_SECONDS = float(os.getenv("MAINTENANCE_INTERVAL_SECONDS", "3600"))
+
+ARCHIVED_COLUMNS = [column.name for column in Attempt.__table__.columns]
+DATETIME_COLUMNS = {"completed_at", "analyzed_at"}
+
+def archive_path(month: datetime, archive_dir: str = ARCHIVE_DIR) -> str:
+    return os.path.join(archive_dir, f"attempts-{month:%Y-%m}.ndjson.gz")
+
+def to_record(attempt: Attempt) -> dict:
+    record = {column: getattr(attempt, column) for column in ARCHIVED_COLUMNS}
+    for column in DATETIME_COLUMNS:
+        if record[column] is not None:
+            record[column] = record[column].isoformat()
+    return record
+
+def from_record(record: dict) -> Attempt:
+    values = dict(record)
+    for column in DATETIME_COLUMNS:
+        if values.get(column) is not None:
+            values[column] = datetime.fromisoformat(values[column])
+    return Attempt(**values)
+
+def archive_invalid_attempts(db, before: datetime = None, archive_dir: str = ARCHIVE_DIR) -> int:
+    """
+    Move invalid attempts completed before the cutoff into gzipped NDJSON files, one per month.
+    
+    Each batch is written and flushed to disk before its rows are deleted, so a
+    crash can at worst leave a row both archived and in the table; restoring
+    skips ids that already exist.
+    
+    Returns:
+        Number of attempts archived
+    """
+    before = before or datetime.utcnow() - timedelta(days=ARCHIVE_AFTER_DAYS)
+    os.makedirs(archive_dir, exist_ok=True)
+    total = 0
+    while True:
+        attempts = db.query(Attempt).filter(
+            Attempt.is_valid == False,
+            Attempt.completed_at < before
+        ).order_by(Attempt.completed_at).limit(ARCHIVE_BATCH_SIZE).all()
+        if not attempts:
+            return total
+        
+        by_month = {}
+        for attempt in attempts:
+            by_month.setdefault(month_start(attempt.completed_at), []).append(attempt)
+        for month, month_attempts in by_month.items():
+            # Appending adds a new gzip member; gzip.open reads multi-member files transparently
+            with gzip.open(archive_path(month, archive_dir), "at", encoding="utf-8") as archive:
+                for attempt in month_attempts:
+                    archive.write(json.dumps(to_record(attempt)) + "\n")
+                archive.flush()
+                os.fsync(archive.fileno())
+        
+        db.query(Attempt).filter(
+            Attempt.id.in_([attempt.id for attempt in attempts])
+        ).delete(synchronize_session=False)
+        db.commit()
+        db.expunge_all()
+        total += len(attempts)
+
+def iter_archived(
+    month: datetime,
+    user_id: Optional[int] = None,
+    puzzle_id: Optional[int] = None,
+    archive_dir: str = ARCHIVE_DIR
+) -> Iterator[dict]:
+    """Stream archived attempt records for a month, optionally filtered by user or puzzle"""
+    path = archive_path(month_start(month), archive_dir)
+    if not os.path.exists(path):
+        return
+    with gzip.open(path, "rt", encoding="utf-8") as archive:
+        for line in archive:
+            record = json.loads(line)
+            if user_id is not None and record["user_id"] != user_id:
+                continue
+            if puzzle_id is not None and record["puzzle_id"] != puzzle_id:
+                continue
+            yield record
+
+def restore_attempts(db, month: datetime, archive_dir: str = ARCHIVE_DIR) -> int:
+    """Copy a month of archived attempts back into the attempts table. Returns the number restored."""
+    restored = 0
+    batch = []
+    for record in iter_archived(month, archive_dir=archive_dir):
+        batch.append(record)
+        if len(batch) >= ARCHIVE_BATCH_SIZE:
+            restored += _restore_batch(db, batch)
+            batch = []
+    if batch:
+        restored += _restore_batch(db, batch)
+    return restored
+
+def _restore_batch(db, records) -> int:
+    ids = [record["id"] for record in records]
+    existing = {row.id for row in db.query(Attempt.id).filter(Attempt.id.in_(ids))}
+    new_records = {record["id"]: record for record in records if record["id"] not in existing}
+    db.add_all(from_record(record) for record in new_records.values())
+    db.commit()
+    db.expunge_all()
+    return len(new_records)
+
+def run_maintenance(db):
+    """Create upcoming partitions and archive old invalid attempts"""
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as connection:
+            ensure_partitions(connection)
+    return archive_invalid_attempts(db)
+
+class MaintenanceWorker:
+    """Background thread running run_maintenance on a fixed interval"""
+
+    def __init__(self, session_factory=None, interval: float = MAINTENANCE_INTERVAL_SECONDS):
+        self.session_factory = session_factory or (lambda: SessionLocal(use_primary=True))
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="attempt-maintenance", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while True:
+            db = None
+            try:
+                db = self.session_factory()
+                run_maintenance(db)
+            except Exception as e:
+                if db is not None:
+                    db.rollback()
+                print(f"Attempt maintenance failed: {e}")
+            finally:
+                if db is not None:
+                    db.close()
+            if self._stop.wait(self.interval):
+                return
+
+maintenance_worker = MaintenanceWorker()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive, query and restore old invalid attempts")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    subcommands.add_parser("archive", help="Create partitions and archive old invalid attempts")
+    for name in ("query", "restore"):
+        subcommand = subcommands.add_parser(name)
+        subcommand.add_argument("month", help="Archive month as YYYY-MM")
+        if name == "query":
+            subcommand.add_argument("--user-id", type=int)
+            subcommand.add_argument("--puzzle-id", type=int)
+    args = parser.parse_args()
+
+    db = SessionLocal(use_primary=True)
+    try:
+        if args.command == "archive":
+            print(f"Archived {run_maintenance(db)} attempts")
+        elif args.command == "query":
+            for record in iter_archived(datetime.strptime(args.month, "%Y-%m"), args.user_id, args.puzzle_id):
+                print(json.dumps(record))
+        else:
+            print(f"Restored {restore_attempts(db, datetime.strptime(args.month, '%Y-%m'))} attempts")
+    finally:
+        db.close()
@@ -0,0 +1,51 @@
+import pytest
+from fastapi.testclient import TestClient
+from database import Base, User, Puzzle, make_session_factory
+import main
+
+### Shared fixtures for tests that need a database
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Session factory over a fresh SQLite primary with every table created"""
+    primary, _, factory = make_session_factory(f"sqlite:///{tmp_path / 'primary.db'}")
+    Base.metadata.create_all(bind=primary)
+    return factory
+
+@pytest.fixture
+def db(session_factory):
+    db = session_factory()
+    yield db
+    db.close()
+
+@pytest.fixture
+def user(db):
+    user = User(username="player", email="player@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    return user
+
+@pytest.fixture
+def add_puzzle(db):
+    """Insert a puzzle with the given layout and return it"""
+    def add(grid, start_pos, end_pos, portal_pairs=None, name="Maze"):
+        puzzle = Puzzle(name=name, description="", grid=grid, start_pos=start_pos, end_pos=end_pos,
+                        portal_pairs=portal_pairs or {}, difficulty=1)
+        db.add(puzzle)
+        db.commit()
+        return puzzle
+    return add
+
+@pytest.fixture
+def client(session_factory):
+    """TestClient whose get_db dependency opens sessions from session_factory"""
+    def get_test_db():
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    main.app.dependency_overrides[main.get_db] = get_test_db
+    yield TestClient(main.app)
+    main.app.dependency_overrides.clear()
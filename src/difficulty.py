@@ -0,0 +1,78 @@
+from typing import List, Tuple
+
+from logic import shortest_solution
+
+# Weights turning the raw metrics into a single score
+DOOR_WEIGHT = 5
+PORTAL_WEIGHT = 3
+DEAD_END_WEIGHT = 20
+# Score given to mazes that can't be solved, so they sort after every real puzzle
+UNSOLVABLE_SCORE = 1000
+# (label, highest score in the band) shown to players; test_difficulty checks them against generated puzzles
+DIFFICULTY_BANDS = (("Easy", 12), ("Medium", 18), ("Hard", None))
+
+def dead_end_ratio(grid: List[List[str]]) -> float:
+    """Fraction of open cells with at most one open neighbour"""
+    rows, cols = len(grid), len(grid[0])
+    open_cells = 0
+    dead_ends = 0
+    for r in range(rows):
+        for c in range(cols):
+            if grid[r][c] == '#':
+                continue
+            open_cells += 1
+            neighbours = sum(
+                1 for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1))
+                if 0 <= nr < rows and 0 <= nc < cols and grid[nr][nc] != '#'
+            )
+            if neighbours <= 1 and grid[r][c] not in ('S', 'E'):
+                dead_ends += 1
+    return dead_ends / open_cells if open_cells else 0.0
+
+def score_puzzle(
+    grid: List[List[str]],
+    start_pos: Tuple[int, int],
+    end_pos: Tuple[int, int],
+    portal_pairs: dict[int, List[Tuple[int, int]]]
+) -> dict:
+    """
+    Compute the difficulty metrics of a puzzle.
+    
+    Args:
+        grid: 2D array representing the maze
+        start_pos: Starting position (row, col)
+        end_pos: Goal position (row, col)
+        portal_pairs: Mapping of portal IDs to their two positions
+        
+    Returns:
+        Dictionary with optimal_moves, doors_on_path, portals_on_path,
+        dead_end_ratio and the combined difficulty score
+    """
+    path = shortest_solution(grid, start_pos, end_pos, portal_pairs)
+    ratio = dead_end_ratio(grid)
+    if path is None:
+        return {
+            'optimal_moves': None,
+            'doors_on_path': 0,
+            'portals_on_path': 0,
+            'dead_end_ratio': ratio,
+            'difficulty': UNSOLVABLE_SCORE
+        }
+    
+    stepped = [grid[r][c] for _, (r, c) in path]
+    doors = sum(1 for cell in stepped if cell == 'D')
+    portals = sum(1 for cell in stepped if cell.startswith('P'))
+    score = len(path) + DOOR_WEIGHT * doors + PORTAL_WEIGHT * portals + DEAD_END_WEIGHT * ratio
+    return {
+        'optimal_moves': len(path),
+        'doors_on_path': doors,
+        'portals_on_path': portals,
+        'dead_end_ratio': ratio,
+        'difficulty': round(score)
+    }
+
+def difficulty_label(score: int) -> str:
+    """Name of the DIFFICULTY_BANDS band a score falls in"""
+    for label, highest in DIFFICULTY_BANDS:
+        if highest is None or score <= highest:
+            return label
@@ -0,0 +1,116 @@
+import os
+import re
+from typing import List
+
+from starlette.middleware.gzip import GZipMiddleware
+
+from difficulty import difficulty_label
+
+COMPACT_MEDIA_TYPE = "application/vnd.maze.compact+json"
+# Responses smaller than this are sent uncompressed; gzip framing would outweigh the savings
+GZIP_MINIMUM_SIZE = int(os.getenv("GZIP_MINIMUM_SIZE", "1024"))
+GZIP_COMPRESS_LEVEL = int(os.getenv("GZIP_COMPRESS_LEVEL", "6"))
+
+CELL_CODES = {'.', '#', 'S', 'E', 'K', 'D'}
+RUN = re.compile(r'(\d*)(\D)')
+
+def media_ranges(accept: str) -> dict:
+    """Quality value of each media range in an Accept header; malformed q values count as 0"""
+    ranges = {}
+    for part in (accept or "").split(","):
+        media_type, *params = [piece.strip() for piece in part.split(";")]
+        if not media_type:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        ranges[media_type.lower()] = max(quality, ranges.get(media_type.lower(), 0.0))
+    return ranges
+
+def wants_compact(accept: str) -> bool:
+    """Whether the Accept header prefers the compact puzzle encoding to plain JSON"""
+    ranges = media_ranges(accept)
+    compact = ranges.get(COMPACT_MEDIA_TYPE, 0.0)
+    plain = max(ranges.get(media_type, 0.0) for media_type in ("application/json", "application/*", "*/*"))
+    return compact > 0 and compact >= plain
+
+def encode_grid(grid: List[List[str]]) -> str:
+    """
+    Run-length encode a grid row by row into one string.
+    
+    Each cell becomes one character (portals are just 'P'; their ids travel in
+    the portals array) and runs of two or more equal cells become <count><char>.
+    """
+    codes = []
+    for row in grid:
+        for cell in row:
+            code = 'P' if cell.startswith('P') else cell
+            if code not in CELL_CODES and code != 'P':
+                raise ValueError(f"Cannot encode cell '{cell}'")
+            codes.append(code)
+    
+    runs = []
+    i = 0
+    while i < len(codes):
+        j = i
+        while j < len(codes) and codes[j] == codes[i]:
+            j += 1
+        runs.append(f"{j - i}{codes[i]}" if j - i > 1 else codes[i])
+        i = j
+    return "".join(runs)
+
+def flatten_portals(portal_pairs: dict) -> List[int]:
+    """Portal pairs as a flat [id, row1, col1, row2, col2, ...] array"""
+    flat = []
+    for portal_id, positions in sorted((portal_pairs or {}).items(), key=lambda item: int(item[0])):
+        (r1, c1), (r2, c2) = positions
+        flat.extend([int(portal_id), r1, c1, r2, c2])
+    return flat
+
+def decode_grid(cells: str, rows: int, cols: int, portals: List[int]) -> List[List[str]]:
+    """Inverse of encode_grid, restoring portal cells to 'P<id>'"""
+    flat = []
+    for count, code in RUN.findall(cells):
+        flat.extend(code * int(count or 1))
+    if len(flat) != rows * cols:
+        raise ValueError("Encoded grid does not match its dimensions")
+    grid = [flat[r * cols:(r + 1) * cols] for r in range(rows)]
+    for i in range(0, len(portals), 5):
+        portal_id, r1, c1, r2, c2 = portals[i:i + 5]
+        grid[r1][c1] = grid[r2][c2] = f"P{portal_id}"
+    return grid
+
+def compact_puzzle(puzzle) -> dict:
+    """Compact representation of a puzzle row or PuzzleResponse"""
+    return {
+        "id": puzzle.id,
+        "name": puzzle.name,
+        "description": puzzle.description,
+        "rows": len(puzzle.grid),
+        "cols": len(puzzle.grid[0]),
+        "cells": encode_grid(puzzle.grid),
+        "start_pos": list(puzzle.start_pos),
+        "end_pos": list(puzzle.end_pos),
+        "portals": flatten_portals(puzzle.portal_pairs),
+        "difficulty": puzzle.difficulty,
+        "difficulty_label": difficulty_label(puzzle.difficulty)
+    }
+
+class CompressionMiddleware(GZipMiddleware):
+    """GZip responses above a size threshold, except streams that must flush every message"""
+
+    def __init__(self, app, minimum_size: int = GZIP_MINIMUM_SIZE, compresslevel: int = GZIP_COMPRESS_LEVEL,
+                 skip_paths=()):
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.skip_paths = set(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
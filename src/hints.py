@@ -0,0 +1,222 @@
+import mmap
+import os
+import queue
+import struct
+import threading
+from array import array
+from collections import OrderedDict, deque
+from typing import Iterable, List, Optional, Tuple
+
+from logic import DIRECTIONS, portal_exits, next_states
+
+HINT_DIR = os.getenv("HINT_DIR", "hint_tables")
+# Number of memory-mapped hint tables kept open
+HINT_CACHE_SIZE = int(os.getenv("HINT_CACHE_SIZE", "256"))
+# Puzzles with more (position, keys) states than this get no hint table
+HINT_MAX_STATES = int(os.getenv("HINT_MAX_STATES", "4000000"))
+
+ACTIONS = list(DIRECTIONS)
+NO_ACTION = 255
+UNREACHABLE = 0xFFFF
+HEADER = struct.Struct("<4sHHH")  # magic, rows, cols, number of keys
+MAGIC = b"HNT1"
+
+def build_hint_table(
+    grid: List[List[str]],
+    end_pos: Tuple[int, int],
+    portal_pairs: dict[int, List[Tuple[int, int]]]
+) -> Optional[bytes]:
+    """
+    Compute the distance to the goal and the best next move for every (position, keys held) state.
+    
+    Every state is expanded with the validator's move rules, then a reverse
+    breadth-first search from the goal labels each state with its distance and
+    the first move of an optimal path.
+    
+    Returns:
+        The serialized table, or None if the puzzle has too many states
+    """
+    rows, cols = len(grid), len(grid[0])
+    key_positions = sorted((r, c) for r in range(rows) for c in range(cols) if grid[r][c] == 'K')
+    key_bits = {position: 1 << i for i, position in enumerate(key_positions)}
+    cells = rows * cols
+    total_states = cells << len(key_positions)
+    # Packed predecessor entries keep the source state in 30 bits
+    if total_states > min(HINT_MAX_STATES, 1 << 30) or cells > 0xFFFF:
+        return None
+    
+    def index_of(state) -> int:
+        r, c, keys = state
+        mask = 0
+        for key in keys:
+            mask |= key_bits[key]
+        return mask * cells + r * cols + c
+    
+    exits = portal_exits(portal_pairs)
+    goal = tuple(end_pos)
+    
+    def moves():
+        """Yield (source, target, action index) for every move out of a state other than the goal"""
+        for mask in range(1 << len(key_positions)):
+            keys = frozenset(position for position in key_positions if mask & key_bits[position])
+            for r in range(rows):
+                for c in range(cols):
+                    if grid[r][c] == '#' or (r, c) == goal:
+                        continue
+                    source = mask * cells + r * cols + c
+                    for action, _, new_state in next_states(grid, exits, (r, c, keys)):
+                        yield source, index_of(new_state), ACTIONS.index(action)
+    
+    # Moves into each state in compressed sparse row form, built in two passes so
+    # no per-state Python objects are needed: the moves into target are
+    # predecessors[offsets[target]:offsets[target + 1]], each packed as source << 2 | action
+    offsets = array("I", [0]) * (total_states + 1)
+    for _, target, _ in moves():
+        offsets[target + 1] += 1
+    for i in range(total_states):
+        offsets[i + 1] += offsets[i]
+    predecessors = array("I", [0]) * offsets[total_states]
+    filled = array("I", offsets)
+    for source, target, action in moves():
+        predecessors[filled[target]] = source << 2 | action
+        filled[target] += 1
+    del filled
+    
+    distances = array("H", [UNREACHABLE]) * total_states
+    actions = array("B", [NO_ACTION]) * total_states
+    pending = deque()
+    for mask in range(1 << len(key_positions)):
+        index = mask * cells + goal[0] * cols + goal[1]
+        distances[index] = 0
+        pending.append(index)
+    while pending:
+        target = pending.popleft()
+        for i in range(offsets[target], offsets[target + 1]):
+            source = predecessors[i] >> 2
+            if distances[source] == UNREACHABLE:
+                distances[source] = min(distances[target] + 1, UNREACHABLE - 1)
+                actions[source] = predecessors[i] & 3
+                pending.append(source)
+    
+    header = HEADER.pack(MAGIC, rows, cols, len(key_positions))
+    keys_block = b"".join(struct.pack("<HH", r, c) for r, c in key_positions)
+    return header + keys_block + distances.tobytes() + actions.tobytes()
+
+class HintTable:
+    """Read-only view over a serialized hint table, usually backed by a memory map"""
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+        magic, self.rows, self.cols, key_count = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a hint table")
+        offset = HEADER.size
+        self.key_bits = {}
+        for i in range(key_count):
+            self.key_bits[struct.unpack_from("<HH", buffer, offset)] = 1 << i
+            offset += 4
+        total_states = (self.rows * self.cols) << key_count
+        view = memoryview(buffer)
+        self._distances = view[offset:offset + 2 * total_states].cast("H")
+        self._actions = view[offset + 2 * total_states:offset + 3 * total_states]
+
+    def lookup(self, row: int, col: int, keys: Iterable[Tuple[int, int]]) -> Tuple[Optional[str], Optional[int]]:
+        """
+        Best next move and remaining moves from a state, or (None, None) if the goal can't be reached.
+        
+        Raises:
+            ValueError: If the position is off the grid or a key isn't a key cell
+        """
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            raise ValueError("Position out of bounds")
+        mask = 0
+        for key in keys:
+            if key not in self.key_bits:
+                raise ValueError(f"No key at {key}")
+            mask |= self.key_bits[key]
+        index = mask * self.rows * self.cols + row * self.cols + col
+        distance = self._distances[index]
+        if distance == UNREACHABLE:
+            return None, None
+        action = self._actions[index]
+        return (ACTIONS[action] if action != NO_ACTION else None), distance
+
+def hint_path(puzzle_id: int, hint_dir: str = HINT_DIR) -> str:
+    return os.path.join(hint_dir, f"puzzle-{puzzle_id}.hint")
+
+def write_hint_table(puzzle_id: int, grid, end_pos, portal_pairs, hint_dir: str = HINT_DIR) -> bool:
+    """Build and atomically write a puzzle's hint table. Returns False if the puzzle is too large."""
+    table = build_hint_table(grid, end_pos, portal_pairs)
+    if table is None:
+        return False
+    os.makedirs(hint_dir, exist_ok=True)
+    path = hint_path(puzzle_id, hint_dir)
+    with open(path + ".tmp", "wb") as f:
+        f.write(table)
+    os.replace(path + ".tmp", path)
+    hint_cache.invalidate(puzzle_id)
+    return True
+
+class HintCache:
+    """LRU of memory-mapped hint tables"""
+
+    def __init__(self, size: int = HINT_CACHE_SIZE, hint_dir: str = HINT_DIR):
+        self.size = size
+        self.hint_dir = hint_dir
+        self._tables: "OrderedDict[int, HintTable]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, puzzle_id: int) -> Optional[HintTable]:
+        with self._lock:
+            table = self._tables.get(puzzle_id)
+            if table is not None:
+                self._tables.move_to_end(puzzle_id)
+                return table
+        path = hint_path(puzzle_id, self.hint_dir)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            table = HintTable(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        with self._lock:
+            self._tables[puzzle_id] = table
+            while len(self._tables) > self.size:
+                self._tables.popitem(last=False)
+        return table
+
+    def invalidate(self, puzzle_id: int):
+        with self._lock:
+            self._tables.pop(puzzle_id, None)
+
+class HintBuilder:
+    """Background worker that builds hint tables for newly created puzzles"""
+
+    def __init__(self, hint_dir: str = HINT_DIR):
+        self.hint_dir = hint_dir
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, puzzle_id: int, grid, end_pos, portal_pairs):
+        self._queue.put((puzzle_id, grid, end_pos, portal_pairs))
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="hint-builder", daemon=True)
+                self._thread.start()
+
+    def wait(self):
+        """Block until every submitted table has been built"""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            puzzle_id, grid, end_pos, portal_pairs = self._queue.get()
+            try:
+                if not write_hint_table(puzzle_id, grid, end_pos, portal_pairs, self.hint_dir):
+                    print(f"Puzzle {puzzle_id} is too large for a hint table")
+            except Exception as e:
+                print(f"Failed to build hint table for puzzle {puzzle_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+hint_cache = HintCache()
+hint_builder = HintBuilder()
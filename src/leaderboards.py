@@ -0,0 +1,238 @@
+import os
+import threading
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import func
+
+from database import SessionLocal, Attempt, User, Puzzle
+from models import LeaderboardEntry
+
+WINDOWS = ("daily", "weekly", "all")
+# Default and maximum number of entries returned by GET /leaderboard
+LEADERBOARD_TOP_N = int(os.getenv("LEADERBOARD_TOP_N", "10"))
+LEADERBOARD_MAX_N = int(os.getenv("LEADERBOARD_MAX_N", "100"))
+# How often newly analyzed attempts are pulled into the in-memory boards
+LEADERBOARD_SYNC_SECONDS = float(os.getenv("LEADERBOARD_SYNC_SECONDS", "2"))
+# Each sync re-reads this much of the analyzed_at history, so attempts committed out of order aren't missed
+LEADERBOARD_SYNC_OVERLAP = timedelta(seconds=float(os.getenv("LEADERBOARD_SYNC_OVERLAP_SECONDS", "60")))
+
+ALL_TIME = datetime(1970, 1, 1)
+
+def bucket_start(window: str, moment: datetime) -> datetime:
+    """Start of the bucket containing moment: midnight for daily, Monday midnight for weekly"""
+    if window == "daily":
+        return datetime(moment.year, moment.month, moment.day)
+    if window == "weekly":
+        day = datetime(moment.year, moment.month, moment.day)
+        return day - timedelta(days=day.weekday())
+    if window == "all":
+        return ALL_TIME
+    raise ValueError(f"Unknown leaderboard window '{window}'")
+
+class RankedBoard:
+    """
+    Best completion per user, kept sorted so top-N and rank lookups are
+    a slice and a binary search respectively.
+    """
+
+    def __init__(self):
+        self._keys: List[Tuple[float, int]] = []  # (completion_time, attempt_id), ascending
+        self._best: Dict[int, Tuple[float, int]] = {}  # user_id -> key in _keys
+        self._entries: Dict[int, Tuple[int, LeaderboardEntry]] = {}  # attempt_id -> (user_id, entry)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def record(self, user_id: int, attempt_id: int, entry: LeaderboardEntry) -> bool:
+        """Store the attempt if it is the user's best. Returns True if the board changed."""
+        key = (entry.completion_time, attempt_id)
+        previous = self._best.get(user_id)
+        if previous is not None:
+            if previous <= key:
+                return False
+            del self._keys[bisect_left(self._keys, previous)]
+            del self._entries[previous[1]]
+        insort(self._keys, key)
+        self._best[user_id] = key
+        self._entries[attempt_id] = (user_id, entry)
+        return True
+
+    def top(self, n: int) -> List[LeaderboardEntry]:
+        return [self._entries[attempt_id][1] for _, attempt_id in self._keys[:n]]
+
+    def rank(self, user_id: int) -> Optional[Tuple[int, LeaderboardEntry]]:
+        """1-based rank and best entry of a user, or None if the user has no entry"""
+        key = self._best.get(user_id)
+        if key is None:
+            return None
+        return bisect_left(self._keys, key) + 1, self._entries[key[1]][1]
+
+class LeaderboardIndex:
+    """
+    In-memory daily, weekly and all-time boards per puzzle and globally.
+
+    Boards are fed from valid attempts the anti-cheat analyzer has cleared and
+    dropped once their day or week is over.
+    """
+
+    def __init__(self):
+        # (window, bucket_start, puzzle_id or None for global) -> board
+        self._boards: Dict[Tuple[str, datetime, Optional[int]], RankedBoard] = {}
+        self._lock = threading.Lock()
+        self._watermark: Optional[datetime] = None
+        self._listeners: List[Callable[[Set[Tuple[str, Optional[int]]]], None]] = []
+
+    def add_listener(self, listener: Callable[[Set[Tuple[str, Optional[int]]]], None]):
+        """Call listener with the (window, puzzle_id) boards that changed after each sync"""
+        self._listeners.append(listener)
+
+    def _board(self, window: str, puzzle_id: Optional[int], now: datetime, create: bool = False) -> Optional[RankedBoard]:
+        key = (window, bucket_start(window, now), puzzle_id)
+        board = self._boards.get(key)
+        if board is None and create:
+            board = self._boards[key] = RankedBoard()
+        return board
+
+    def record(self, user_id: int, puzzle_id: int, attempt_id: int, entry: LeaderboardEntry,
+               now: datetime = None, windows: Tuple[str, ...] = WINDOWS) -> Set[Tuple[str, Optional[int]]]:
+        """Add a cleared attempt to every board whose current bucket contains it. Returns the boards that changed."""
+        now = now or datetime.utcnow()
+        changed = set()
+        with self._lock:
+            for window in windows:
+                if bucket_start(window, entry.completed_at) != bucket_start(window, now):
+                    continue
+                for board_puzzle_id in (puzzle_id, None):
+                    if self._board(window, board_puzzle_id, now, create=True).record(user_id, attempt_id, entry):
+                        changed.add((window, board_puzzle_id))
+        return changed
+
+    def top(self, window: str, puzzle_id: Optional[int], n: int, now: datetime = None) -> List[LeaderboardEntry]:
+        with self._lock:
+            board = self._board(window, puzzle_id, now or datetime.utcnow())
+            return board.top(n) if board else []
+
+    def rank(self, window: str, puzzle_id: Optional[int], user_id: int, now: datetime = None):
+        """Returns (rank, entry, board size) or None if the user isn't on the board"""
+        with self._lock:
+            board = self._board(window, puzzle_id, now or datetime.utcnow())
+            found = board.rank(user_id) if board else None
+            return (*found, len(board)) if found else None
+
+    def expire(self, now: datetime = None) -> Set[Tuple[str, Optional[int]]]:
+        """Drop boards whose window has rolled over. Returns the (window, puzzle_id) boards dropped."""
+        now = now or datetime.utcnow()
+        with self._lock:
+            dropped = {
+                (window, puzzle_id) for window, start, puzzle_id in self._boards
+                if start != bucket_start(window, now)
+            }
+            self._boards = {
+                key: board for key, board in self._boards.items()
+                if key[1] == bucket_start(key[0], now)
+            }
+        return dropped
+
+    def _cleared_attempts(self, db, *columns):
+        """Leaderboard columns of valid attempts the analyzer has cleared, without the move log"""
+        return db.query(
+            Attempt.id, Attempt.user_id, Attempt.puzzle_id, Attempt.completion_time, Attempt.completed_at,
+            Attempt.analyzed_at, User.username, Puzzle.name.label("puzzle_name"),
+            func.coalesce(Attempt.move_count, func.json_array_length(Attempt.moves)).label("move_count"),
+            *columns
+        ).join(User, User.id == Attempt.user_id).join(Puzzle, Puzzle.id == Attempt.puzzle_id).filter(
+            Attempt.is_valid == True,
+            Attempt.is_flagged == False,
+            Attempt.analyzed_at.isnot(None)
+        )
+
+    def _load(self, rows, now: datetime, windows: Tuple[str, ...] = WINDOWS):
+        """Record rows from _cleared_attempts. Returns (attempt ids read, boards changed, latest analyzed_at)."""
+        read = set()
+        changed = set()
+        latest = None
+        for row in rows:
+            entry = LeaderboardEntry(
+                username=row.username,
+                puzzle_name=row.puzzle_name,
+                completion_time=row.completion_time,
+                total_moves=row.move_count,
+                completed_at=row.completed_at
+            )
+            changed |= self.record(row.user_id, row.puzzle_id, row.id, entry, now, windows)
+            read.add(row.id)
+            if latest is None or row.analyzed_at > latest:
+                latest = row.analyzed_at
+        return read, changed, latest
+
+    def sync(self, db, now: datetime = None) -> int:
+        """Pull attempts analyzed since the last sync into the boards. Returns the number read."""
+        now = now or datetime.utcnow()
+        if self._watermark is None:
+            # First load: only each user's best per puzzle can reach the all-time boards, and
+            # only attempts from the current week can reach the daily and weekly ones
+            latest = db.query(func.max(Attempt.analyzed_at)).filter(
+                Attempt.is_valid == True,
+                Attempt.is_flagged == False
+            ).scalar()
+            ranked = self._cleared_attempts(db, func.row_number().over(
+                partition_by=(Attempt.user_id, Attempt.puzzle_id),
+                order_by=(Attempt.completion_time, Attempt.id)
+            ).label("position")).subquery()
+            read, changed, _ = self._load(
+                db.query(ranked).filter(ranked.c.position == 1).yield_per(1000), now, ("all",)
+            )
+            recent = self._cleared_attempts(db).filter(Attempt.completed_at >= bucket_start("weekly", now))
+            recent_read, recent_changed, _ = self._load(recent.yield_per(1000), now, ("daily", "weekly"))
+            read |= recent_read
+            changed |= recent_changed
+        else:
+            query = self._cleared_attempts(db).filter(Attempt.analyzed_at >= self._watermark - LEADERBOARD_SYNC_OVERLAP)
+            read, changed, latest = self._load(query.yield_per(1000), now)
+            latest = max(latest or self._watermark, self._watermark)
+        self._watermark = latest
+        # Spectators of a board that rolled over need the new, possibly empty, board
+        changed |= self.expire(now)
+        if changed:
+            for listener in self._listeners:
+                listener(changed)
+        return len(read)
+
+class LeaderboardSyncer:
+    """Background thread that keeps a LeaderboardIndex in step with the database"""
+
+    def __init__(self, index: LeaderboardIndex, session_factory=None, interval: float = LEADERBOARD_SYNC_SECONDS):
+        self.index = index
+        self.session_factory = session_factory or SessionLocal
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="leaderboard-sync", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while True:
+            db = self.session_factory()
+            try:
+                self.index.sync(db)
+            except Exception as e:
+                print(f"Leaderboard sync failed: {e}")
+            finally:
+                db.close()
+            if self._stop.wait(self.interval):
+                return
+
+leaderboard_index = LeaderboardIndex()
+leaderboard_syncer = LeaderboardSyncer(leaderboard_index)
@@ -0,0 +1,106 @@
+import asyncio
+import json
+import os
+import threading
+from typing import Dict, Hashable, Optional, Set, Tuple
+
+from leaderboards import leaderboard_index, LEADERBOARD_TOP_N
+
+# Messages buffered per client before it is considered too slow and dropped
+LIVE_BUFFER_SIZE = int(os.getenv("LIVE_BUFFER_SIZE", "16"))
+# Seconds between keep-alive comments on idle streams
+LIVE_KEEPALIVE_SECONDS = float(os.getenv("LIVE_KEEPALIVE_SECONDS", "15"))
+
+class Subscription:
+    def __init__(self, topic: Hashable, buffer_size: int):
+        self.topic = topic
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+
+class Broadcaster:
+    """
+    Fan out messages to subscribers of a topic.
+
+    publish may be called from any thread; delivery happens on the event loop
+    the subscribers live on. A message is serialized once by the publisher and
+    the same string is queued for every subscriber. Subscribers whose buffer is
+    full are dropped rather than slowing everyone else down.
+    """
+
+    def __init__(self, buffer_size: int = LIVE_BUFFER_SIZE):
+        self.buffer_size = buffer_size
+        self._subscribers: Dict[Hashable, Set[Subscription]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic: Hashable) -> Subscription:
+        """Register a subscriber; must be called from the event loop"""
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(topic, self.buffer_size)
+        with self._lock:
+            self._subscribers.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.topic]
+
+    def has_subscribers(self, topic: Hashable) -> bool:
+        return bool(self._subscribers.get(topic))
+
+    def publish(self, topic: Hashable, message: str):
+        if self._loop is None or not self.has_subscribers(topic):
+            return
+        self._loop.call_soon_threadsafe(self._fan_out, topic, message)
+
+    def _fan_out(self, topic: Hashable, message: str):
+        with self._lock:
+            subscribers = list(self._subscribers.get(topic, ()))
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self.unsubscribe(subscription)
+                # Replace the backlog with the end-of-stream marker so the client is disconnected
+                while not subscription.queue.empty():
+                    subscription.queue.get_nowait()
+                subscription.queue.put_nowait(None)
+
+def leaderboard_message(window: str, puzzle_id: Optional[int]) -> str:
+    entries = leaderboard_index.top(window, puzzle_id, LEADERBOARD_TOP_N)
+    return json.dumps({
+        "window": window,
+        "puzzle_id": puzzle_id,
+        "entries": [entry.model_dump(mode="json") for entry in entries]
+    })
+
+def publish_leaderboard_changes(changed: Set[Tuple[str, Optional[int]]]):
+    """Broadcast the new top-N once per changed board that has spectators"""
+    for topic in changed:
+        if broadcaster.has_subscribers(topic):
+            broadcaster.publish(topic, leaderboard_message(*topic))
+
+async def leaderboard_events(request, window: str, puzzle_id: Optional[int]):
+    """Server-Sent Events stream: the current board, then the board again whenever it changes"""
+    subscription = broadcaster.subscribe((window, puzzle_id))
+    try:
+        yield f"data: {leaderboard_message(window, puzzle_id)}\n\n"
+        while True:
+            try:
+                message = await asyncio.wait_for(subscription.queue.get(), LIVE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                yield ": keep-alive\n\n"
+                continue
+            if message is None:
+                return
+            yield f"data: {message}\n\n"
+    finally:
+        broadcaster.unsubscribe(subscription)
+
+broadcaster = Broadcaster()
+leaderboard_index.add_listener(publish_leaderboard_changes)
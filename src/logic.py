@@ -1,64 +1,65 @@
-from typing import List, Tuple
+from typing import Iterable, List, Optional, Tuple
+from collections import deque
 from models import MoveRequest
 
-def validate_maze_solution(
-    grid: List[List[str]], 
-    start_pos: Tuple[int, int], 
-    end_pos: Tuple[int, int],
-    portal_pairs: dict[int, List[Tuple[int, int]]],
-    moves: List[MoveRequest]
-) -> Tuple[bool, str]:
+class MazeSimulator:
     """
-    Validate a maze solution by simulating the player's moves.
+    Simulate a player's moves one at a time.
     
-    Args:
-        grid: 2D array representing the maze
-        start_pos: Starting position (row, col)
-        end_pos: Goal position (row, col)  
-        moves: List of move commands ('up', 'down', 'left', 'right')
-        
-    Returns:
-        Tuple of (is_valid: bool, message: str)
+    Moves are pushed with move(), so callers can validate a solution while it is
+    still being received and stop at the first invalid move.
     """
     
-    if not moves:
-        return False, "No moves provided"
-    
-    rows, cols = len(grid), len(grid[0])
-    current_pos = list(start_pos)
-    keys_collected = set()
-    visited_positions = set()
+    def __init__(
+        self,
+        grid: List[List[str]],
+        start_pos: Tuple[int, int],
+        end_pos: Tuple[int, int],
+        portal_pairs: dict[int, List[Tuple[int, int]]]
+    ):
+        self.grid = grid
+        self.end_pos = end_pos
+        self.portal_pairs = portal_pairs
+        self.rows, self.cols = len(grid), len(grid[0])
+        self.current_pos = list(start_pos)
+        self.keys_collected = set()
+        self.steps = 0
     
-    def is_valid_position(pos: List[int]) -> bool:
+    def is_valid_position(self, pos: List[int]) -> bool:
         """Check if position is within bounds"""
-        return 0 <= pos[0] < rows and 0 <= pos[1] < cols
+        return 0 <= pos[0] < self.rows and 0 <= pos[1] < self.cols
     
-    def can_move_to(pos: List[int]) -> Tuple[bool, str]:
+    def can_move_to(self, pos: List[int]) -> Tuple[bool, str]:
         """Check if player can move to this position"""
-        if not is_valid_position(pos):
+        if not self.is_valid_position(pos):
             return False, "Position out of bounds"
         
-        cell = grid[pos[0]][pos[1]]
+        cell = self.grid[pos[0]][pos[1]]
         
         if cell == '#':
             return False, "Cannot move through walls"
         
         if cell == 'D':
             # Check if we have at least one key
-            if not keys_collected:
+            if not self.keys_collected:
                 return False, "Need a key to pass through door"
             # Use one key
-            keys_collected.pop()
+            self.keys_collected.pop()
             return True, "Used key to pass through door"
         
         return True, "Valid move"
     
-    # Simulate each move
-    for i, move_request in enumerate(moves):
-        visited_positions.add(tuple(current_pos))
-        move = move_request.action
+    def move(self, move: str) -> Tuple[Optional[bool], str]:
+        """
+        Apply one move.
+        
+        Returns:
+            (False, reason) for an invalid move, (True, message) once the goal is
+            reached, otherwise (None, "") to keep going
+        """
+        self.steps += 1
         # Calculate new position based on move
-        new_pos = current_pos.copy()
+        new_pos = self.current_pos.copy()
         if move == 'up':
             new_pos[0] -= 1
         elif move == 'down':
@@ -68,39 +69,69 @@ def validate_maze_solution(
         elif move == 'right':
             new_pos[1] += 1
         else:
-            return False, f"Invalid move '{move}' at step {i + 1}"
+            return False, f"Invalid move '{move}' at step {self.steps}"
         
         # Check if move is valid
-        can_move, move_message = can_move_to(new_pos)
+        can_move, move_message = self.can_move_to(new_pos)
         if not can_move:
-            return False, f"Invalid move at step {i + 1}: {move_message}"
+            return False, f"Invalid move at step {self.steps}: {move_message}"
         
         # Update position
-        current_pos = new_pos
-        cell = grid[current_pos[0]][current_pos[1]]
+        self.current_pos = new_pos
+        cell = self.grid[new_pos[0]][new_pos[1]]
         
         # Handle special cells
         if cell == 'K':
-            keys_collected.add((current_pos[0], current_pos[1]))
+            self.keys_collected.add((new_pos[0], new_pos[1]))
         elif cell.startswith('P'):
             # Teleport through portal
-            portal_pos = current_pos.copy()
+            portal_pos = new_pos.copy()
             other_portal_pos = None
-            for tuples_list in portal_pairs.values():
+            for tuples_list in self.portal_pairs.values():
                 if portal_pos in tuples_list:
                     other_portal_pos = tuples_list[0] if tuples_list[1] == portal_pos else tuples_list[1]
             if other_portal_pos:
-                current_pos = other_portal_pos
+                self.current_pos = other_portal_pos
         
         # Check if we've reached the goal
-        if tuple(current_pos) == tuple(end_pos):
-            return True, f"Congratulations! Maze completed in {len(moves)} moves!"
+        if tuple(self.current_pos) == tuple(self.end_pos):
+            return True, f"Congratulations! Maze completed in {self.steps} moves!"
+        return None, ""
     
-    # If we finish all moves but haven't reached the goal
-    if tuple(current_pos) == tuple(end_pos):
-        return True, f"Congratulations! Maze completed in {len(moves)} moves!"
-    else:
-        return False, f"Did not reach the goal. Final position: ({current_pos[0]}, {current_pos[1]}), Goal: {end_pos}"
+    def finish(self) -> Tuple[bool, str]:
+        """Result once there are no more moves"""
+        if self.steps == 0:
+            return False, "No moves provided"
+        if tuple(self.current_pos) == tuple(self.end_pos):
+            return True, f"Congratulations! Maze completed in {self.steps} moves!"
+        return False, f"Did not reach the goal. Final position: ({self.current_pos[0]}, {self.current_pos[1]}), Goal: {self.end_pos}"
+
+def validate_maze_solution(
+    grid: List[List[str]], 
+    start_pos: Tuple[int, int], 
+    end_pos: Tuple[int, int],
+    portal_pairs: dict[int, List[Tuple[int, int]]],
+    moves: Iterable[MoveRequest]
+) -> Tuple[bool, str]:
+    """
+    Validate a maze solution by simulating the player's moves.
+    
+    Args:
+        grid: 2D array representing the maze
+        start_pos: Starting position (row, col)
+        end_pos: Goal position (row, col)  
+        moves: Move commands ('up', 'down', 'left', 'right'); any iterable,
+            consumed only up to the first invalid move or the goal
+        
+    Returns:
+        Tuple of (is_valid: bool, message: str)
+    """
+    simulator = MazeSimulator(grid, start_pos, end_pos, portal_pairs)
+    for move_request in moves:
+        result, message = simulator.move(move_request.action)
+        if result is not None:
+            return result, message
+    return simulator.finish()
 
 def get_maze_info(grid: List[List[str]]) -> dict:
     """
@@ -138,4 +169,94 @@ def get_maze_info(grid: List[List[str]]) -> dict:
         'walls': walls,
         'total_keys': len(keys),
         'total_doors': len(doors)
-    }
\ No newline at end of file
+    }
+
+DIRECTIONS = {'up': (-1, 0), 'down': (1, 0), 'left': (0, -1), 'right': (0, 1)}
+
+def portal_exits(portal_pairs: dict[int, List[Tuple[int, int]]]) -> dict:
+    """Map each portal position to the position of its partner"""
+    exits = {}
+    for positions in portal_pairs.values():
+        first, second = tuple(positions[0]), tuple(positions[1])
+        exits[first] = second
+        exits[second] = first
+    return exits
+
+def next_states(grid: List[List[str]], exits: dict, state: tuple):
+    """
+    Yield every state reachable in one move under the validate_maze_solution rules.
+    
+    A state is (row, col, keys held). Doors consume a key on every pass and the
+    validator spends an arbitrary key, so a door yields one state per key held.
+    
+    Yields:
+        Tuples of (action, stepped (row, col) before teleporting, new state)
+    """
+    rows, cols = len(grid), len(grid[0])
+    r, c, keys = state
+    for action, (dr, dc) in DIRECTIONS.items():
+        nr, nc = r + dr, c + dc
+        if not (0 <= nr < rows and 0 <= nc < cols):
+            continue
+        cell = grid[nr][nc]
+        if cell == '#':
+            continue
+        if cell == 'D':
+            key_options = [keys - {key} for key in keys]
+        elif cell == 'K':
+            key_options = [keys | {(nr, nc)}]
+        else:
+            key_options = [keys]
+        tr, tc = exits.get((nr, nc), (nr, nc)) if cell.startswith('P') else (nr, nc)
+        for new_keys in key_options:
+            yield action, (nr, nc), (tr, tc, new_keys)
+
+def shortest_solution(
+    grid: List[List[str]],
+    start_pos: Tuple[int, int],
+    end_pos: Tuple[int, int],
+    portal_pairs: dict[int, List[Tuple[int, int]]]
+) -> Optional[List[Tuple[str, Tuple[int, int]]]]:
+    """
+    Find an optimal solution under the same rules as validate_maze_solution.
+    
+    Args:
+        grid: 2D array representing the maze
+        start_pos: Starting position (row, col)
+        end_pos: Goal position (row, col)
+        portal_pairs: Mapping of portal IDs to their two positions
+        
+    Returns:
+        List of (action, stepped cell) pairs, or None if the maze can't be solved
+    """
+    exits = portal_exits(portal_pairs)
+    goal = tuple(end_pos)
+    start_state = (start_pos[0], start_pos[1], frozenset())
+    parents = {start_state: None}
+    queue = deque([start_state])
+    
+    while queue:
+        state = queue.popleft()
+        for action, stepped, new_state in next_states(grid, exits, state):
+            if new_state in parents:
+                continue
+            parents[new_state] = (state, action, stepped)
+            if new_state[:2] == goal:
+                path = []
+                while parents[new_state] is not None:
+                    new_state, action, stepped = parents[new_state]
+                    path.append((action, stepped))
+                return path[::-1]
+            queue.append(new_state)
+    
+    return None
+
+def shortest_solution_length(
+    grid: List[List[str]],
+    start_pos: Tuple[int, int],
+    end_pos: Tuple[int, int],
+    portal_pairs: dict[int, List[Tuple[int, int]]]
+) -> Optional[int]:
+    """Number of moves in an optimal solution, or None if the maze can't be solved"""
+    path = shortest_solution(grid, start_pos, end_pos, portal_pairs)
+    return len(path) if path is not None else None
@@ -1,17 +1,31 @@
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Request, Response, Query
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, JSONResponse
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from array import array
 from datetime import datetime, timedelta
 import jwt
 import bcrypt
 import uvicorn
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import os
 
-from database import SessionLocal, User, Puzzle, Attempt
-from models import UserCreate, UserLogin, TokenResponse, PuzzleResponse, AttemptRequest, AttemptResponse, LeaderboardEntry
-from logic import validate_maze_solution
+from database import SessionLocal, replica_set, User, Puzzle, Attempt
+from models import UserCreate, UserLogin, TokenResponse, PuzzleResponse, AttemptRequest, AttemptResponse, LeaderboardEntry, LeaderboardRankResponse, HintResponse
+from logic import validate_maze_solution, MazeSimulator, DIRECTIONS
+from difficulty import difficulty_label
+from streaming import MoveStreamParser, STREAM_MAX_BODY_BYTES
+from encoding import CompressionMiddleware, COMPACT_MEDIA_TYPE, wants_compact, compact_puzzle
+from anticheat import analyzer
+from archive import maintenance_worker
+from hints import hint_builder, hint_cache, hint_path
+from live import leaderboard_events
+from leaderboards import leaderboard_index, leaderboard_syncer, LEADERBOARD_TOP_N, LEADERBOARD_MAX_N
+from throttling import (
+    auth_ip_limiter, login_user_limiter, submit_ip_limiter, submit_user_limiter, read_coalescer, ip_rate_limit, client_ip
+)
 
 app = FastAPI(
     title="Maze Puzzle API",
@@ -28,12 +42,44 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compression; the leaderboard event stream is skipped so each update is flushed immediately
+app.add_middleware(CompressionMiddleware, skip_paths=["/leaderboard/stream"])
+
+@app.on_event("startup")
+def start_workers():
+    replica_set.start()
+    analyzer.start()
+    leaderboard_syncer.start()
+    maintenance_worker.start()
+    build_missing_hint_tables()
+
+def build_missing_hint_tables():
+    """Queue hint tables for puzzles that don't have one yet, e.g. ones created before hints existed"""
+    db = SessionLocal()
+    try:
+        for puzzle in db.query(Puzzle):
+            if not os.path.exists(hint_path(puzzle.id)):
+                hint_builder.submit(puzzle.id, puzzle.grid, puzzle.end_pos, puzzle.portal_pairs)
+    finally:
+        db.close()
+
+@app.on_event("shutdown")
+def stop_workers():
+    maintenance_worker.stop()
+    leaderboard_syncer.stop()
+    analyzer.stop()
+    replica_set.stop()
+
 # Security
 security = HTTPBearer(auto_error=False)
 JWT_SECRET = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_HOURS = 24
 
+# One-byte codes for the move log the streaming endpoint keeps while reading
+MOVE_ACTIONS = list(DIRECTIONS)
+MOVE_CODES = {action: code for code, action in enumerate(MOVE_ACTIONS)}
+
 def get_db():
     db = SessionLocal()
     try:
@@ -41,6 +87,14 @@ def get_db():
     finally:
         db.close()
 
+def get_primary_db():
+    """Session pinned to the primary, for read-then-write flows that can't tolerate replica lag"""
+    db = SessionLocal(use_primary=True)
+    try:
+        yield db
+    finally:
+        db.close()
+
 def create_jwt_token(user_id: int) -> str:
     payload = {
         "user_id": user_id,
@@ -60,14 +114,23 @@ def verify_jwt_token(credentials: HTTPAuthorizationCredentials = Depends(securit
     except jwt.JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+def limit_submissions(request: Request, user_id: int = Depends(verify_jwt_token)):
+    """Apply the per-IP and per-user submission limits before touching the database"""
+    submit_ip_limiter.check(client_ip(request))
+    submit_user_limiter.check(user_id)
+
 def get_current_user(user_id: int = Depends(verify_jwt_token), db: Session = Depends(get_db)) -> User:
     user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        # A user who just registered may not have reached the replica yet
+        db.use_primary = True
+        user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
-@app.post("/auth/register", response_model=TokenResponse)
-def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
+@app.post("/auth/register", response_model=TokenResponse, dependencies=[Depends(ip_rate_limit(auth_ip_limiter))])
+def register_user(user_data: UserCreate, db: Session = Depends(get_primary_db)):
     """Register a new user account"""
     
     # Check if user already exists
@@ -105,10 +168,12 @@ def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
         username=new_user.username
     )
 
-@app.post("/auth/login", response_model=TokenResponse)
-def login_user(user_data: UserLogin, db: Session = Depends(get_db)):
+@app.post("/auth/login", response_model=TokenResponse, dependencies=[Depends(ip_rate_limit(auth_ip_limiter))])
+def login_user(user_data: UserLogin, request: Request, db: Session = Depends(get_db)):
     """Authenticate user and return JWT token"""
     
+    # Throttle password guessing against one account without letting other clients lock its owner out
+    login_user_limiter.check((user_data.username, client_ip(request)))
     user = db.query(User).filter(User.username == user_data.username).first()
     
     if not user or not bcrypt.checkpw(user_data.password.encode('utf-8'), user.hashed_password.encode('utf-8')):
@@ -127,9 +192,33 @@ def login_user(user_data: UserLogin, db: Session = Depends(get_db)):
     )
 
 @app.get("/puzzles", response_model=List[PuzzleResponse])
-def get_puzzles(db: Session = Depends(get_db)):
-    """Get all available puzzles"""
-    puzzles = db.query(Puzzle).all()
+def get_puzzles(
+    request: Request,
+    response: Response,
+    min_difficulty: Optional[int] = None,
+    max_difficulty: Optional[int] = None,
+    sort: str = Query("id", pattern="^(id|difficulty|-difficulty)$"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get all available puzzles, optionally within a difficulty range and sorted by difficulty.
+    Send Accept: application/vnd.maze.compact+json for run-length encoded grids.
+    """
+    query = db.query(Puzzle)
+    if min_difficulty is not None:
+        query = query.filter(Puzzle.difficulty >= min_difficulty)
+    if max_difficulty is not None:
+        query = query.filter(Puzzle.difficulty <= max_difficulty)
+    if sort == "difficulty":
+        query = query.order_by(Puzzle.difficulty.asc(), Puzzle.id)
+    elif sort == "-difficulty":
+        query = query.order_by(Puzzle.difficulty.desc(), Puzzle.id)
+    else:
+        query = query.order_by(Puzzle.id)
+    puzzles = query.all()
+    if wants_compact(request.headers.get("accept")):
+        return compact_response([compact_puzzle(puzzle) for puzzle in puzzles])
+    response.headers["Vary"] = "Accept"
     return [
         PuzzleResponse(
             id=puzzle.id,
@@ -138,14 +227,27 @@ def get_puzzles(db: Session = Depends(get_db)):
             grid=puzzle.grid,
             start_pos=puzzle.start_pos,
             end_pos=puzzle.end_pos,
-            difficulty=len(puzzle.grid)
+            difficulty=puzzle.difficulty,
+            difficulty_label=difficulty_label(puzzle.difficulty)
         )
         for puzzle in puzzles
     ]
 
 @app.get("/puzzles/{puzzle_id}", response_model=PuzzleResponse)
-def get_puzzle(puzzle_id: int, db: Session = Depends(get_db)):
-    """Get a specific puzzle by ID"""
+def get_puzzle(puzzle_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    """Get a specific puzzle by ID, compact encoded if the Accept header asks for it"""
+    # Concurrent requests for the same puzzle share a single query
+    puzzle = read_coalescer.do(("puzzle", puzzle_id), lambda: load_puzzle(puzzle_id, db))
+    if wants_compact(request.headers.get("accept")):
+        return compact_response(compact_puzzle(puzzle))
+    response.headers["Vary"] = "Accept"
+    return puzzle
+
+def compact_response(content) -> JSONResponse:
+    # Both representations share a URL, so caches must key on Accept; the JSON branches set it too
+    return JSONResponse(content, media_type=COMPACT_MEDIA_TYPE, headers={"Vary": "Accept"})
+
+def load_puzzle(puzzle_id: int, db: Session) -> PuzzleResponse:
     puzzle = db.query(Puzzle).filter(Puzzle.id == puzzle_id).first()
     
     if not puzzle:
@@ -159,10 +261,24 @@ def get_puzzle(puzzle_id: int, db: Session = Depends(get_db)):
         start_pos=puzzle.start_pos,
         end_pos=puzzle.end_pos,
         portal_pairs=puzzle.portal_pairs,
-        difficulty=len(puzzle.grid)
+        difficulty=puzzle.difficulty,
+        difficulty_label=difficulty_label(puzzle.difficulty)
     )
 
-@app.post("/puzzles/{puzzle_id}/attempt", response_model=AttemptResponse)
+@app.get("/puzzles/{puzzle_id}/hint", response_model=HintResponse)
+def get_hint(puzzle_id: int, row: int, col: int, keys: List[str] = Query([])):
+    """Get the best next move from a position, given the keys held as "row,col" strings"""
+    table = hint_cache.get(puzzle_id)
+    if table is None:
+        raise HTTPException(status_code=404, detail="No hints available for this puzzle")
+    try:
+        key_positions = [tuple(int(part) for part in key.split(",")) for key in keys]
+        action, moves_to_goal = table.lookup(row, col, key_positions)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return HintResponse(action=action, moves_to_goal=moves_to_goal)
+
+@app.post("/puzzles/{puzzle_id}/attempt", response_model=AttemptResponse, dependencies=[Depends(limit_submissions)])
 def submit_attempt(
     puzzle_id: int,
     attempt: AttemptRequest,
@@ -183,47 +299,152 @@ def submit_attempt(
     )
     completion_time = attempt.moves[-1].timestamp - attempt.moves[0].timestamp
     
-    # Save attempt to database
+    save_attempt(
+        db,
+        current_user.id,
+        puzzle_id,
+        [move.action for move in attempt.moves],
+        [move.timestamp for move in attempt.moves],
+        is_valid,
+        completion_time
+    )
+    
+    return AttemptResponse(
+        is_valid=is_valid,
+        message=message,
+        completion_time=completion_time if is_valid else None,
+        total_moves=len(attempt.moves)
+    )
+
+def save_attempt(db: Session, user_id: int, puzzle_id: int, actions: List[str], timestamps: List[int],
+                 is_valid: bool, completion_time: float):
     new_attempt = Attempt(
-        user_id=current_user.id,
+        user_id=user_id,
         puzzle_id=puzzle_id,
-        moves=[move.action for move in attempt.moves],
+        moves=actions,
+        move_count=len(actions),
+        move_timestamps=timestamps,
         is_valid=is_valid,
         completion_time=completion_time if is_valid else None
     )
     db.add(new_attempt)
     db.commit()
     
+    # Client timestamps are untrusted; replay valid attempts in the background
+    if is_valid:
+        analyzer.submit(new_attempt.id)
+
+@app.post("/puzzles/{puzzle_id}/attempt/stream", response_model=AttemptResponse, dependencies=[Depends(limit_submissions)])
+async def submit_attempt_stream(
+    puzzle_id: int,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Submit a long attempt without buffering it. The body has the same shape as
+    AttemptRequest; moves are simulated as they arrive and reading stops at the
+    first invalid move or once the goal is reached.
+
+    The request body is never held in full, but the move log that gets stored
+    is: it is kept compactly while reading, then expanded into the lists the
+    JSON columns are written from. Its size is bounded by STREAM_MAX_BODY_BYTES.
+    """
+    puzzle = await run_in_threadpool(lambda: db.query(Puzzle).filter(Puzzle.id == puzzle_id).first())
+    if not puzzle:
+        raise HTTPException(status_code=404, detail="Puzzle not found")
+    
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > STREAM_MAX_BODY_BYTES:
+        raise HTTPException(status_code=413, detail="Attempt too large")
+    
+    simulator = MazeSimulator(puzzle.grid, puzzle.start_pos, puzzle.end_pos, puzzle.portal_pairs)
+    parser = MoveStreamParser()
+    # Only the move log that gets stored is kept: one byte per action and a machine int per timestamp
+    action_codes = bytearray()
+    timestamps = array("q")
+    unknown_action = None
+    result = None
+    received = 0
+    
+    def simulate(moves) -> Optional[Tuple[bool, str]]:
+        nonlocal unknown_action
+        for action, timestamp in moves:
+            if action in MOVE_CODES:
+                action_codes.append(MOVE_CODES[action])
+            else:
+                # An unknown action ends the simulation, so it is always the last move
+                unknown_action = action
+            timestamps.append(timestamp)
+            outcome, message = simulator.move(action)
+            if outcome is not None:
+                return outcome, message
+        return None
+    
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > STREAM_MAX_BODY_BYTES:
+                raise HTTPException(status_code=413, detail="Attempt too large")
+            result = simulate(parser.feed(chunk))
+            if result is not None:
+                break
+        else:
+            result = simulate(parser.close()) or simulator.finish()
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    is_valid, message = result
+    completion_time = timestamps[-1] - timestamps[0] if timestamps else None
+    # Store the move log exactly as /attempt would, unknown action included
+    actions = [MOVE_ACTIONS[code] for code in action_codes]
+    if unknown_action is not None:
+        actions.append(unknown_action)
+    await run_in_threadpool(
+        save_attempt, db, current_user.id, puzzle_id, actions, timestamps.tolist(), is_valid, completion_time
+    )
+    
     return AttemptResponse(
         is_valid=is_valid,
         message=message,
         completion_time=completion_time if is_valid else None,
-        total_moves=len(attempt.moves)
+        total_moves=len(timestamps)
     )
 
+LEADERBOARD_WINDOW = Query("all", pattern="^(daily|weekly|all)$")
+
 @app.get("/leaderboard", response_model=List[LeaderboardEntry])
-def get_leaderboard(puzzle_id: Optional[int] = None, db: Session = Depends(get_db)):
-    """Get leaderboard for all puzzles or a specific puzzle"""
-    
-    query = db.query(Attempt, User, Puzzle).join(User).join(Puzzle).filter(
-        Attempt.is_valid == True
+def get_leaderboard(
+    puzzle_id: Optional[int] = None,
+    window: str = LEADERBOARD_WINDOW,
+    limit: int = Query(LEADERBOARD_TOP_N, ge=1, le=LEADERBOARD_MAX_N)
+):
+    """Get the daily, weekly or all-time leaderboard for all puzzles or a specific puzzle"""
+    return leaderboard_index.top(window, puzzle_id, limit)
+
+@app.get("/leaderboard/stream")
+def stream_leaderboard(request: Request, puzzle_id: Optional[int] = None, window: str = LEADERBOARD_WINDOW):
+    """Server-Sent Events stream of the top entries, pushed whenever the leaderboard changes"""
+    return StreamingResponse(
+        leaderboard_events(request, window, puzzle_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/leaderboard/rank/{user_id}", response_model=LeaderboardRankResponse)
+def get_leaderboard_rank(user_id: int, puzzle_id: Optional[int] = None, window: str = LEADERBOARD_WINDOW):
+    """Get a user's rank on the daily, weekly or all-time leaderboard"""
+    found = leaderboard_index.rank(window, puzzle_id, user_id)
+    if not found:
+        raise HTTPException(status_code=404, detail="User has no ranked completion in this window")
+    rank, entry, total_ranked = found
+    return LeaderboardRankResponse(
+        user_id=user_id,
+        window=window,
+        rank=rank,
+        total_ranked=total_ranked,
+        entry=entry
     )
-    
-    if puzzle_id:
-        query = query.filter(Attempt.puzzle_id == puzzle_id)
-    
-    attempts = query.order_by(Attempt.completion_time.asc()).limit(10).all()
-    
-    return [
-        LeaderboardEntry(
-            username=attempt.User.username,
-            puzzle_name=attempt.Puzzle.name,
-            completion_time=attempt.Attempt.completion_time,
-            total_moves=len(attempt.Attempt.moves),
-            completed_at=attempt.Attempt.completed_at
-        )
-        for attempt in attempts
-    ]
 
 @app.get("/")
 def root():
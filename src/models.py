@@ -26,6 +26,7 @@ class PuzzleResponse(BaseModel):
     end_pos: Tuple[int, int]
     portal_pairs: dict[int, List[Tuple[int, int]]] = None
     difficulty: int
+    difficulty_label: str
 
 class MoveRequest(BaseModel):
     action: str  # 'up', 'down', 'left', 'right'
@@ -44,4 +45,15 @@ class LeaderboardEntry(BaseModel):
     puzzle_name: str
     completion_time: float
     total_moves: int
-    completed_at: datetime
\ No newline at end of file
+    completed_at: datetime
+
+class LeaderboardRankResponse(BaseModel):
+    user_id: int
+    window: str
+    rank: int
+    total_ranked: int
+    entry: LeaderboardEntry
+
+class HintResponse(BaseModel):
+    action: Optional[str]  # Best next move, None once the goal is reached or unreachable
+    moves_to_goal: Optional[int]  # None if the goal can't be reached from this state
\ No newline at end of file
@@ -1,6 +1,7 @@
 
 import random
 from collections import deque
+from difficulty import score_puzzle
 
 def generate_puzzle(difficulty, name):
     """
@@ -103,17 +104,27 @@ def generate_puzzle(difficulty, name):
         
         # Verify the puzzle is solvable
         if is_solvable(grid, start_pos, end_pos, size, key_positions, portal_pairs):
-            return {
+            puzzle = with_difficulty({
                 "name": name,
                 "description": description,
                 "grid": grid,
                 "start_pos": start_pos,
                 "end_pos": end_pos,
                 "portal_pairs": portal_pairs
-            }
+            })
+            # is_solvable doesn't model forced portal jumps, so also require a solution under the validator's rules
+            if puzzle["optimal_moves"] is not None:
+                return puzzle
     
     # If we couldn't generate a valid puzzle, create a simple guaranteed solvable one
-    return create_fallback_puzzle(difficulty)
+    return with_difficulty(create_fallback_puzzle(difficulty))
+
+def with_difficulty(puzzle):
+    """Score the puzzle once so the difficulty can be stored alongside it."""
+    metrics = score_puzzle(puzzle["grid"], puzzle["start_pos"], puzzle["end_pos"], puzzle["portal_pairs"])
+    puzzle["difficulty"] = metrics["difficulty"]
+    puzzle["optimal_moves"] = metrics["optimal_moves"]
+    return puzzle
 
 def has_basic_path(grid, start, end, size):
     """Check if there's a basic path from start to end, ignoring doors."""
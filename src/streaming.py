@@ -0,0 +1,121 @@
+import codecs
+import json
+import os
+import re
+from typing import Iterator, Tuple
+
+# Largest accepted body for a streamed attempt
+STREAM_MAX_BODY_BYTES = int(os.getenv("STREAM_MAX_BODY_BYTES", str(32 * 1024 * 1024)))
+# Largest accepted encoding of a single move object
+MAX_MOVE_CHARS = 1024
+# Timestamps are kept as signed 64-bit integers while the attempt is read
+MIN_TIMESTAMP, MAX_TIMESTAMP = -2 ** 63, 2 ** 63 - 1
+
+PREFIX = re.compile(r'\s*\{\s*"moves"\s*:\s*\[')
+WHITESPACE = re.compile(r'\s*')
+
+class MoveStreamParser:
+    """
+    Incremental parser for an AttemptRequest body, {"moves": [{"action": ..., "timestamp": ...}, ...]}.
+
+    Chunks are fed as they arrive and complete moves are yielded as (action,
+    timestamp) pairs. Only the unparsed tail of the body is buffered, so memory
+    doesn't grow with the number of moves.
+
+    Raises:
+        ValueError: On malformed JSON or moves, as soon as it is detected
+    """
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._state = "prefix"
+        self._need_comma = False
+        self._after_comma = False
+
+    def feed(self, chunk: bytes) -> Iterator[Tuple[str, int]]:
+        self._buffer += self._decoder.decode(chunk)
+        return self._parse()
+
+    def close(self) -> Iterator[Tuple[str, int]]:
+        self._buffer += self._decoder.decode(b"", final=True)
+        yield from self._parse()
+        if self._state != "done":
+            raise ValueError("Unexpected end of request body")
+
+    def _parse(self) -> Iterator[Tuple[str, int]]:
+        # Walk the buffer by index and drop the consumed part once, instead of re-slicing per move
+        buffer = self._buffer
+        pos = 0
+        try:
+            while True:
+                if self._state == "prefix":
+                    end = buffer.find("[", pos)
+                    if end == -1:
+                        if len(buffer) - pos > MAX_MOVE_CHARS:
+                            raise ValueError('Expected a body of the form {"moves": [...]}')
+                        return
+                    match = PREFIX.match(buffer, pos)
+                    if not match or match.end() != end + 1:
+                        raise ValueError('Expected a body of the form {"moves": [...]}')
+                    pos = match.end()
+                    self._state = "moves"
+                
+                elif self._state == "moves":
+                    pos = WHITESPACE.match(buffer, pos).end()
+                    if pos == len(buffer):
+                        return
+                    head = buffer[pos]
+                    if head == "]" and not self._after_comma:
+                        pos += 1
+                        self._state = "suffix"
+                    elif self._need_comma:
+                        if head != ",":
+                            raise ValueError("Expected ',' between moves")
+                        pos += 1
+                        self._need_comma = False
+                        self._after_comma = True
+                    elif head != "{":
+                        raise ValueError("Each move must be an object")
+                    else:
+                        try:
+                            move, pos_after = self._json.raw_decode(buffer, pos)
+                        except json.JSONDecodeError:
+                            # Most likely the object continues in the next chunk
+                            if len(buffer) - pos > MAX_MOVE_CHARS:
+                                raise ValueError("Move object is too large or malformed")
+                            return
+                        pos = pos_after
+                        self._need_comma = True
+                        self._after_comma = False
+                        yield parse_move(move)
+                
+                elif self._state == "suffix":
+                    pos = WHITESPACE.match(buffer, pos).end()
+                    if pos == len(buffer):
+                        return
+                    if buffer[pos] != "}":
+                        raise ValueError("Only a moves list is accepted")
+                    pos += 1
+                    self._state = "done"
+                
+                else:
+                    if buffer[pos:].strip():
+                        raise ValueError("Unexpected data after request body")
+                    pos = len(buffer)
+                    return
+        finally:
+            self._buffer = buffer[pos:]
+
+def parse_move(move) -> Tuple[str, int]:
+    if not isinstance(move, dict):
+        raise ValueError("Each move must be an object")
+    action, timestamp = move.get("action"), move.get("timestamp")
+    if not isinstance(action, str):
+        raise ValueError("Move action must be a string")
+    if not isinstance(timestamp, int) or isinstance(timestamp, bool):
+        raise ValueError("Move timestamp must be an integer")
+    if not MIN_TIMESTAMP <= timestamp <= MAX_TIMESTAMP:
+        raise ValueError("Move timestamp is out of range")
+    return action, timestamp
@@ -0,0 +1,100 @@
+import pytest
+from types import SimpleNamespace
+import time
+from database import Attempt
+from anticheat import AttemptAnalyzer, analyze_attempt, analyze_batch
+
+### Unit Tests for the Anti-Cheat Analyzer
+
+PUZZLE = SimpleNamespace(
+    grid=[["S", ".", ".", ".", "E"]],
+    start_pos=[0, 0],
+    end_pos=[0, 4],
+    portal_pairs={},
+)
+ACTIONS = ["right", "right", "right", "right"]
+
+def test_analyze_attempt_legitimate():
+    """Test that a plausibly paced solution is not flagged."""
+    assert analyze_attempt(PUZZLE, ACTIONS, [0, 500, 1000, 1500]) is None
+
+def test_analyze_attempt_non_monotonic():
+    """Test that timestamps going backwards are flagged."""
+    reason = analyze_attempt(PUZZLE, ACTIONS, [0, 500, 400, 1500])
+    assert "Non-monotonic" in reason
+
+def test_analyze_attempt_impossible_interval():
+    """Test that inhumanly fast key presses are flagged."""
+    reason = analyze_attempt(PUZZLE, ACTIONS, [0, 500, 501, 1500])
+    assert "Impossible interval" in reason
+
+def test_analyze_attempt_below_par():
+    """Test that a steady but too fast solution is flagged."""
+    reason = analyze_attempt(PUZZLE, ACTIONS, [0, 50, 100, 150])
+    assert "below par" in reason
+
+def test_analyze_attempt_replay_fails():
+    """Test that moves which don't reach the goal are flagged."""
+    reason = analyze_attempt(PUZZLE, ["right", "left", "right", "right"], [0, 500, 1000, 1500])
+    assert "does not reach the goal" in reason
+
+def test_analyze_attempt_legacy_without_timestamps():
+    """Test that attempts stored before timestamps existed are replayed and par checked, not flagged outright."""
+    assert analyze_attempt(PUZZLE, ACTIONS, None, completion_time=1500) is None
+    assert analyze_attempt(PUZZLE, ACTIONS, None) is None
+    assert "below par" in analyze_attempt(PUZZLE, ACTIONS, None, completion_time=100)
+    assert "does not reach the goal" in analyze_attempt(PUZZLE, ["right", "left"], None, completion_time=1500)
+
+def test_analyze_batch_clears_legacy_attempt(db, user, add_puzzle):
+    """Test that a historical attempt with no move_timestamps is marked analyzed without a flag."""
+    puzzle = add_puzzle(PUZZLE.grid, PUZZLE.start_pos, PUZZLE.end_pos)
+    legacy = Attempt(user_id=user.id, puzzle_id=puzzle.id, moves=ACTIONS, is_valid=True, completion_time=1500)
+    db.add(legacy)
+    db.commit()
+
+    assert analyze_batch(db, [legacy.id]) == 0
+    db.expire_all()
+    assert legacy.is_flagged is False and legacy.analyzed_at is not None
+
+def test_analyze_batch_marks_attempts(db, user, add_puzzle):
+    """Test that a batch marks every attempt analyzed and only flags the suspicious ones."""
+    puzzle = add_puzzle(PUZZLE.grid, PUZZLE.start_pos, PUZZLE.end_pos)
+    honest = Attempt(user_id=user.id, puzzle_id=puzzle.id, moves=ACTIONS, move_timestamps=[0, 500, 1000, 1500],
+                     is_valid=True, completion_time=1500)
+    cheater = Attempt(user_id=user.id, puzzle_id=puzzle.id, moves=ACTIONS, move_timestamps=[0, 1, 2, 3],
+                      is_valid=True, completion_time=3)
+    db.add_all([honest, cheater])
+    db.commit()
+
+    assert analyze_batch(db, [honest.id, cheater.id]) == 1
+    db.expire_all()
+    assert honest.is_flagged is False and honest.analyzed_at is not None
+    assert cheater.is_flagged is True and cheater.analyzed_at is not None
+
+def test_analyzer_retries_after_session_failure(session_factory, db, user, add_puzzle):
+    """Test that the worker survives a failing session factory and a later sweep analyzes the attempt."""
+    puzzle = add_puzzle(PUZZLE.grid, PUZZLE.start_pos, PUZZLE.end_pos)
+    attempt = Attempt(user_id=user.id, puzzle_id=puzzle.id, moves=ACTIONS, move_timestamps=[0, 500, 1000, 1500],
+                      is_valid=True, completion_time=1500)
+    db.add(attempt)
+    db.commit()
+
+    calls = []
+    def flaky_factory():
+        calls.append(None)
+        if len(calls) == 1:
+            raise RuntimeError("database unavailable")
+        return session_factory()
+
+    worker = AttemptAnalyzer(session_factory=flaky_factory, sweep_interval=0.05)
+    worker.start()
+    try:
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            db.expire_all()
+            if attempt.analyzed_at is not None:
+                break
+            time.sleep(0.05)
+    finally:
+        worker.stop()
+    assert attempt.analyzed_at is not None
@@ -0,0 +1,122 @@
+import runpy
+import sys
+import time
+import pytest
+from contextlib import nullcontext
+from datetime import datetime
+from types import SimpleNamespace
+from sqlalchemy import create_mock_engine
+from database import Attempt, month_start, create_postgres_tables, ensure_partitions
+import archive
+from archive import MaintenanceWorker, run_maintenance, archive_invalid_attempts, iter_archived, restore_attempts
+
+### Unit Tests for Attempt Archival
+
+@pytest.fixture
+def attempts(db, user, add_puzzle):
+    puzzle = add_puzzle([["S", "E"]], [0, 0], [0, 1])
+    db.add_all([
+        Attempt(user_id=user.id, puzzle_id=puzzle.id, moves=["left"], move_timestamps=[0], is_valid=False,
+                completed_at=datetime(2026, 8, 3)),
+        Attempt(user_id=user.id, puzzle_id=puzzle.id, moves=["up"], move_timestamps=[0], is_valid=False,
+                completed_at=datetime(2026, 9, 3)),
+        Attempt(user_id=user.id, puzzle_id=puzzle.id, moves=["right"], is_valid=True, completion_time=1000,
+                completed_at=datetime(2026, 8, 4)),
+        Attempt(user_id=user.id, puzzle_id=puzzle.id, moves=["down"], is_valid=False,
+                completed_at=datetime(2026, 10, 18)),
+    ])
+    db.commit()
+
+def test_month_start():
+    """Test month boundaries, including across a year end."""
+    assert month_start(datetime(2026, 12, 15, 8)) == datetime(2026, 12, 1)
+    assert month_start(datetime(2026, 12, 15), 1) == datetime(2027, 1, 1)
+
+def test_archive_moves_only_old_invalid_attempts(db, attempts, tmp_path):
+    """Test that old invalid attempts leave the table and land in monthly archives."""
+    archive_dir = str(tmp_path / "archive")
+    assert archive_invalid_attempts(db, datetime(2026, 10, 1), archive_dir) == 2
+
+    remaining = sorted(attempt.moves[0] for attempt in db.query(Attempt))
+    assert remaining == ["down", "right"]
+    august = list(iter_archived(datetime(2026, 8, 1), archive_dir=archive_dir))
+    assert [record["moves"] for record in august] == [["left"]]
+    assert list(iter_archived(datetime(2026, 9, 1), puzzle_id=999, archive_dir=archive_dir)) == []
+
+def test_restore_is_idempotent(db, attempts, tmp_path):
+    """Test that restoring brings rows back once, with their original ids and timestamps."""
+    archive_dir = str(tmp_path / "archive")
+    archive_invalid_attempts(db, datetime(2026, 10, 1), archive_dir)
+
+    assert restore_attempts(db, datetime(2026, 9, 1), archive_dir) == 1
+    assert restore_attempts(db, datetime(2026, 9, 1), archive_dir) == 0
+    restored = db.query(Attempt).filter(Attempt.completed_at == datetime(2026, 9, 3)).one()
+    assert restored.moves == ["up"]
+
+def test_postgres_tables_created_in_dependency_order():
+    """Test that users and puzzles exist before the partitioned attempts table and its partitions."""
+    statements = []
+    def record(sql, *args, **kwargs):
+        statements.append(" ".join(str(sql.compile(dialect=engine.dialect)).split()))
+        return SimpleNamespace(scalar=lambda: "p")  # relkind of a partitioned attempts table
+    engine = create_mock_engine("postgresql://", record)
+
+    create_postgres_tables(engine)
+    position = lambda prefix: next(i for i, sql in enumerate(statements) if sql.startswith(prefix))
+    attempts = position("CREATE TABLE attempts ")
+    assert position("CREATE TABLE users ") < attempts
+    assert position("CREATE TABLE puzzles ") < attempts
+    assert "PARTITION BY RANGE (completed_at)" in statements[attempts]
+    assert attempts < position("CREATE TABLE IF NOT EXISTS attempts_default PARTITION OF attempts")
+
+class FakeConnection:
+    """Records SQL sent to a PostgreSQL connection whose attempts table has the given relkind"""
+
+    def __init__(self, relkind):
+        self.relkind = relkind
+        self.statements = []
+
+    def execute(self, statement):
+        self.statements.append(str(statement))
+        return SimpleNamespace(scalar=lambda: self.relkind)
+
+def test_ensure_partitions_skips_unpartitioned_table():
+    """Test that a plain attempts table from before partitioning is left alone instead of failing."""
+    connection = FakeConnection("r")
+    assert ensure_partitions(connection, now=datetime(2026, 10, 1)) is False
+    assert not any("PARTITION OF" in sql for sql in connection.statements)
+
+    connection = FakeConnection("p")
+    assert ensure_partitions(connection, now=datetime(2026, 10, 1), months_ahead=1) is True
+    assert sum("PARTITION OF" in sql for sql in connection.statements) == 3
+
+def test_maintenance_archives_with_unpartitioned_table(db, attempts, tmp_path, monkeypatch):
+    """Test that archiving still runs on an upgraded database whose attempts table isn't partitioned."""
+    connection = FakeConnection("r")
+    monkeypatch.setattr(archive, "engine", SimpleNamespace(
+        dialect=SimpleNamespace(name="postgresql"), begin=lambda: nullcontext(connection)
+    ))
+    monkeypatch.chdir(tmp_path)
+    assert run_maintenance(db) == 2
+
+def test_maintenance_worker_survives_session_failure():
+    """Test that a failing session factory doesn't kill the maintenance thread."""
+    calls = []
+    def failing_factory():
+        calls.append(None)
+        raise RuntimeError("database unavailable")
+
+    worker = MaintenanceWorker(session_factory=failing_factory, interval=0.01)
+    worker.start()
+    deadline = time.monotonic() + 5
+    while len(calls) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    worker.stop()
+    assert len(calls) >= 2
+
+def test_cli_query_runs(tmp_path, monkeypatch, capsys):
+    """Test that the archive CLI opens its session and queries an empty archive."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, "argv", ["archive.py", "query", "2026-08"])
+    runpy.run_module("archive", run_name="__main__")
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,115 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from database import Base, Puzzle, make_session_factory
+import main
+
+### Tests for read/write routing between the primary and read replicas
+
+PUZZLE = {
+    "name": "Routing Maze",
+    "description": "",
+    "grid": [["S", "E"]],
+    "start_pos": [0, 0],
+    "end_pos": [0, 1],
+    "portal_pairs": {},
+    "difficulty": 1,
+}
+
+@pytest.fixture
+def databases(tmp_path):
+    primary_url = f"sqlite:///{tmp_path / 'primary.db'}"
+    replica_url = f"sqlite:///{tmp_path / 'replica.db'}"
+    primary, replicas, factory = make_session_factory(primary_url, [replica_url])
+    Base.metadata.create_all(bind=primary)
+    for engine in replicas.engines:
+        Base.metadata.create_all(bind=engine)
+    return primary, replicas, factory
+
+def test_reads_go_to_replica(databases):
+    """A fresh session reads from the replica, not the primary."""
+    primary, replicas, factory = databases
+    with primary.begin() as connection:
+        connection.execute(Puzzle.__table__.insert(), PUZZLE)
+
+    db = factory()
+    assert db.query(Puzzle).count() == 0
+    db.close()
+
+def test_writes_go_to_primary(databases):
+    """Inserts land on the primary and later reads in the same session stay there."""
+    primary, replicas, factory = databases
+    db = factory()
+    db.add(Puzzle(**PUZZLE))
+    db.commit()
+    assert db.query(Puzzle).count() == 1
+    db.close()
+
+    with primary.connect() as connection:
+        assert connection.execute(text("SELECT COUNT(*) FROM puzzles")).scalar() == 1
+    with replicas.engines[0].connect() as connection:
+        assert connection.execute(text("SELECT COUNT(*) FROM puzzles")).scalar() == 0
+
+def test_falls_back_to_primary_when_replica_down(tmp_path):
+    """Reads use the primary when the only replica can't be reached."""
+    primary_url = f"sqlite:///{tmp_path / 'primary.db'}"
+    replica_url = f"sqlite:///{tmp_path / 'missing' / 'replica.db'}"
+    primary, replicas, factory = make_session_factory(primary_url, [replica_url])
+    Base.metadata.create_all(bind=primary)
+    replicas.check_all()
+
+    db = factory()
+    db.add(Puzzle(**PUZZLE))
+    db.commit()
+    db.close()
+
+    db = factory()
+    assert db.query(Puzzle).count() == 1
+    assert db.get_bind() is primary
+    db.close()
+
+def test_failed_query_marks_replica_down(tmp_path):
+    """A connection error on a replica takes it out of rotation without a separate probe."""
+    primary_url = f"sqlite:///{tmp_path / 'primary.db'}"
+    replica_url = f"sqlite:///{tmp_path / 'missing' / 'replica.db'}"
+    primary, replicas, factory = make_session_factory(primary_url, [replica_url])
+    Base.metadata.create_all(bind=primary)
+
+    db = factory()
+    with pytest.raises(OperationalError):
+        db.query(Puzzle).count()
+    db.close()
+
+    db = factory()
+    assert db.query(Puzzle).count() == 0
+    assert db.get_bind() is primary
+    db.close()
+
+def test_use_primary_pins_session(databases):
+    """A session built with use_primary=True reads from the primary."""
+    primary, replicas, factory = databases
+    with primary.begin() as connection:
+        connection.execute(Puzzle.__table__.insert(), PUZZLE)
+
+    db = factory(use_primary=True)
+    assert db.query(Puzzle).count() == 1
+    assert db.get_bind() is primary
+    db.close()
+
+def test_register_then_authenticate_before_replication(databases, monkeypatch):
+    """Registering writes through the primary and the new user resolves while the replica lags."""
+    primary, replicas, factory = databases
+    monkeypatch.setattr(main, "SessionLocal", factory)
+
+    response = TestClient(main.app).post("/auth/register", json={
+        "username": "newcomer", "email": "newcomer@example.com", "password": "secret",
+    })
+    assert response.status_code == 200
+    user_id = response.json()["user_id"]
+
+    with replicas.engines[0].connect() as connection:
+        assert connection.execute(text("SELECT COUNT(*) FROM users")).scalar() == 0
+    db = factory()
+    assert main.get_current_user(user_id, db).username == "newcomer"
+    db.close()
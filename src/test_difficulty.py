@@ -0,0 +1,65 @@
+import pytest
+import random
+import statistics
+from difficulty import score_puzzle, dead_end_ratio, difficulty_label, UNSOLVABLE_SCORE
+from puzzle_create import generate_puzzle, create_fallback_puzzle, with_difficulty
+
+### Unit Tests for the Difficulty Scoring Engine
+
+def test_score_simple_corridor():
+    """Test metrics for a corridor with no special cells."""
+    metrics = score_puzzle([["S", ".", "E"]], (0, 0), (0, 2), {})
+    assert metrics["optimal_moves"] == 2
+    assert metrics["doors_on_path"] == 0
+    assert metrics["portals_on_path"] == 0
+    assert metrics["difficulty"] == 2
+
+def test_score_counts_doors_and_portals():
+    """Test that doors and portals on the optimal path raise the score."""
+    grid = [
+        ["S", "K", "D", "P1"],
+        ["#", "#", "#", "#"],
+        ["P1", ".", ".", "E"]
+    ]
+    metrics = score_puzzle(grid, (0, 0), (2, 3), {1: [[0, 3], [2, 0]]})
+    assert metrics["optimal_moves"] == 6
+    assert metrics["doors_on_path"] == 1
+    assert metrics["portals_on_path"] == 1
+    assert metrics["difficulty"] > metrics["optimal_moves"]
+
+def test_score_unsolvable():
+    """Test that unsolvable mazes get the sentinel score."""
+    metrics = score_puzzle([["S", "#", "E"]], (0, 0), (0, 2), {})
+    assert metrics["optimal_moves"] is None
+    assert metrics["difficulty"] == UNSOLVABLE_SCORE
+
+def test_dead_end_ratio():
+    """Test that only non start/end cells with a single exit count as dead ends."""
+    grid = [
+        ["S", ".", "E"],
+        ["#", ".", "#"]
+    ]
+    assert dead_end_ratio(grid) == pytest.approx(1 / 4)
+
+def test_generated_puzzles_are_scored():
+    """Test that generated puzzles carry a stored difficulty and are solvable."""
+    for level in ("easy", "medium", "hard"):
+        puzzle = generate_puzzle(level, "Scored")
+        assert puzzle["optimal_moves"] is not None
+        assert puzzle["difficulty"] >= puzzle["optimal_moves"]
+
+@pytest.mark.parametrize("level", ["easy", "medium", "hard"])
+def test_difficulty_bands_match_generated_puzzles(level):
+    """Test that a typical generated puzzle and the fallback of each level are labelled as that level."""
+    random.seed(7)
+    scores = [generate_puzzle(level, "Banded")["difficulty"] for _ in range(100)]
+    assert difficulty_label(statistics.median(scores)) == level.capitalize()
+    assert difficulty_label(with_difficulty(create_fallback_puzzle(level))["difficulty"]) == level.capitalize()
+
+def test_difficulty_label_edges():
+    """Test band boundaries and unsolvable mazes."""
+    assert difficulty_label(12) == "Easy"
+    assert difficulty_label(13) == "Medium"
+    assert difficulty_label(18) == "Medium"
+    assert difficulty_label(19) == "Hard"
+    assert difficulty_label(UNSOLVABLE_SCORE) == "Hard"
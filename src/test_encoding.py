@@ -0,0 +1,60 @@
+import json
+import pytest
+from encoding import encode_grid, decode_grid, flatten_portals, compact_puzzle, wants_compact, COMPACT_MEDIA_TYPE
+from puzzle_create import generate_puzzle
+from types import SimpleNamespace
+
+### Unit Tests for the Compact Puzzle Encoding
+
+def test_encode_grid_run_length():
+    """Test that runs collapse and portal ids are dropped from cells."""
+    grid = [
+        ["S", ".", ".", "P1"],
+        ["#", "#", "#", "#"],
+        ["P1", ".", ".", "E"]
+    ]
+    assert encode_grid(grid) == "S2.P4#P2.E"
+
+def test_round_trip_generated_puzzles():
+    """Test that decoding restores the exact grid, including portal ids."""
+    for level in ("easy", "medium", "hard"):
+        puzzle = generate_puzzle(level, "Encoded")
+        rows, cols = len(puzzle["grid"]), len(puzzle["grid"][0])
+        portals = flatten_portals(puzzle["portal_pairs"])
+        assert decode_grid(encode_grid(puzzle["grid"]), rows, cols, portals) == puzzle["grid"]
+
+def test_flatten_portals_accepts_json_keys():
+    """Test that string portal ids from JSON columns are flattened in id order."""
+    assert flatten_portals({"2": [[4, 2], [5, 5]], "1": [[2, 6], [4, 4]]}) == [1, 2, 6, 4, 4, 2, 4, 2, 5, 5]
+
+def test_compact_puzzle_is_smaller():
+    """Test that the compact form is much smaller than the list-of-lists grid."""
+    grid = [["."] * 40 for _ in range(40)]
+    grid[0][0], grid[39][39] = "S", "E"
+    puzzle = SimpleNamespace(id=1, name="Big", description="", grid=grid, start_pos=(0, 0), end_pos=(39, 39),
+                             portal_pairs={}, difficulty=78)
+    assert len(json.dumps(compact_puzzle(puzzle))) * 10 < len(json.dumps(grid))
+
+def test_decode_rejects_wrong_dimensions():
+    """Test that a cell string not matching rows x cols is rejected."""
+    with pytest.raises(ValueError):
+        decode_grid("3.", 2, 2, [])
+
+def test_wants_compact():
+    """Test Accept header negotiation."""
+    assert wants_compact("application/vnd.maze.compact+json, application/json;q=0.5")
+    assert not wants_compact("application/json")
+    assert not wants_compact(None)
+    assert not wants_compact("application/vnd.maze.compact+json;q=0")
+    assert not wants_compact("application/vnd.maze.compact+json; q=0, application/json")
+    assert not wants_compact("application/vnd.maze.compact+json;q=0.2, */*")
+    assert wants_compact("Application/Vnd.Maze.Compact+JSON; q=0.8, application/json;q=0.5")
+
+@pytest.mark.parametrize("accept", ["application/json", COMPACT_MEDIA_TYPE])
+def test_puzzle_responses_vary_on_accept(client, add_puzzle, accept):
+    """Test that both representations of the puzzle endpoints tell caches to key on Accept."""
+    puzzle = add_puzzle([["S", ".", "E"]], [0, 0], [0, 2])
+    for path in ("/puzzles", f"/puzzles/{puzzle.id}"):
+        response = client.get(path, headers={"Accept": accept})
+        assert response.status_code == 200
+        assert response.headers["vary"] == "Accept"
@@ -0,0 +1,57 @@
+import json
+import random
+import pytest
+from hints import build_hint_table, HintTable, HintCache, write_hint_table
+from logic import MazeSimulator, shortest_solution_length
+from puzzle_create import generate_puzzle
+
+### Unit Tests for the Hint Tables
+
+def test_hint_corridor():
+    """Test the next move and distance along a simple corridor."""
+    table = HintTable(build_hint_table([["S", ".", "E"]], (0, 2), {}))
+    assert table.lookup(0, 0, []) == ("right", 2)
+    assert table.lookup(0, 2, []) == (None, 0)
+
+def test_hint_depends_on_keys():
+    """Test that the hint sends the player for a key only when they don't hold one."""
+    grid = [
+        [".", "S", "D", "E"],
+        ["K", "#", "#", "#"]
+    ]
+    table = HintTable(build_hint_table(grid, (0, 3), {}))
+    assert table.lookup(0, 1, []) == ("left", 6)
+    assert table.lookup(0, 1, [(1, 0)]) == ("right", 2)
+
+def test_hint_unreachable_and_invalid_states():
+    """Test unreachable goals and bad input."""
+    table = HintTable(build_hint_table([["S", "#", "E"]], (0, 2), {}))
+    assert table.lookup(0, 0, []) == (None, None)
+    with pytest.raises(ValueError):
+        table.lookup(5, 0, [])
+    with pytest.raises(ValueError):
+        table.lookup(0, 0, [(0, 1)])
+
+def test_following_hints_solves_generated_puzzles():
+    """Test that repeatedly taking the hint solves a puzzle in the optimal number of moves."""
+    random.seed(3)
+    for level in ("easy", "medium", "hard"):
+        # Round-trip through JSON like a stored puzzle, so portal positions are lists as the simulator expects
+        puzzle = json.loads(json.dumps(generate_puzzle(level, "Hinted")))
+        table = HintTable(build_hint_table(puzzle["grid"], puzzle["end_pos"], puzzle["portal_pairs"]))
+        optimal = shortest_solution_length(puzzle["grid"], puzzle["start_pos"], puzzle["end_pos"], puzzle["portal_pairs"])
+        simulator = MazeSimulator(puzzle["grid"], puzzle["start_pos"], puzzle["end_pos"], puzzle["portal_pairs"])
+        outcome = None
+        while outcome is None and simulator.steps < optimal:
+            action, _ = table.lookup(*simulator.current_pos, simulator.keys_collected)
+            outcome, message = simulator.move(action)
+        assert outcome is True, message
+        assert simulator.steps == optimal
+
+def test_cache_reads_written_tables(tmp_path):
+    """Test that tables written to disk are served through the memory-mapped cache."""
+    hint_dir = str(tmp_path)
+    assert write_hint_table(1, [["S", "E"]], (0, 1), {}, hint_dir)
+    cache = HintCache(size=1, hint_dir=hint_dir)
+    assert cache.get(1).lookup(0, 0, []) == ("right", 1)
+    assert cache.get(2) is None
@@ -0,0 +1,101 @@
+import pytest
+from datetime import datetime, timedelta
+from database import User, Attempt
+from leaderboards import LeaderboardIndex, RankedBoard, bucket_start
+from models import LeaderboardEntry
+
+### Unit Tests for Time-Windowed Leaderboards
+
+NOW = datetime(2026, 10, 14, 12, 0)  # A Wednesday
+
+def make_entry(time, completed_at=NOW, username="player"):
+    return LeaderboardEntry(
+        username=username, puzzle_name="Maze", completion_time=time, total_moves=4, completed_at=completed_at
+    )
+
+def test_bucket_start():
+    """Test day and week bucket boundaries."""
+    assert bucket_start("daily", NOW) == datetime(2026, 10, 14)
+    assert bucket_start("weekly", NOW) == datetime(2026, 10, 12)
+    assert bucket_start("all", NOW) == bucket_start("all", datetime(2020, 1, 1))
+    with pytest.raises(ValueError):
+        bucket_start("monthly", NOW)
+
+def test_ranked_board_keeps_best_per_user():
+    """Test that only a user's best attempt counts and ranks follow completion time."""
+    board = RankedBoard()
+    assert board.record(1, 10, make_entry(3000, username="alice"))
+    assert board.record(2, 11, make_entry(2000, username="bob"))
+    assert not board.record(1, 12, make_entry(4000, username="alice"))
+    assert board.record(1, 13, make_entry(1000, username="alice"))
+
+    assert len(board) == 2
+    assert [entry.username for entry in board.top(10)] == ["alice", "bob"]
+    assert board.rank(2)[0] == 2
+    assert board.rank(3) is None
+
+def test_index_windows_and_expiry():
+    """Test that old attempts only count all-time and that boards expire when the window rolls over."""
+    index = LeaderboardIndex()
+    changed = index.record(1, 7, 100, make_entry(5000), NOW)
+    assert changed == {(window, puzzle_id) for window in ("daily", "weekly", "all") for puzzle_id in (7, None)}
+    index.record(2, 7, 101, make_entry(1000, completed_at=NOW - timedelta(days=1)), NOW)
+
+    assert len(index.top("daily", 7, 10, NOW)) == 1
+    assert len(index.top("weekly", 7, 10, NOW)) == 2
+    assert len(index.top("all", None, 10, NOW)) == 2
+    assert index.rank("all", 7, 1, NOW)[0] == 2
+
+    next_week = NOW + timedelta(days=7)
+    assert index.expire(next_week) == {(window, puzzle_id) for window in ("daily", "weekly") for puzzle_id in (7, None)}
+    assert index.top("daily", 7, 10, next_week) == []
+    assert index.top("weekly", 7, 10, next_week) == []
+    assert len(index.top("all", 7, 10, next_week)) == 2
+
+def test_index_sync_skips_flagged_and_unanalyzed(db, add_puzzle):
+    """Test that syncing only picks up cleared attempts."""
+    users = [User(username=f"user{i}", email=f"user{i}@example.com", hashed_password="x") for i in range(3)]
+    db.add_all(users)
+    puzzle = add_puzzle([["S", "E"]], [0, 0], [0, 1])
+    db.add_all([
+        Attempt(user_id=users[0].id, puzzle_id=puzzle.id, moves=["right"], is_valid=True,
+                completion_time=1000, completed_at=NOW, analyzed_at=NOW),
+        Attempt(user_id=users[1].id, puzzle_id=puzzle.id, moves=["right"], is_valid=True,
+                completion_time=10, completed_at=NOW, analyzed_at=NOW, is_flagged=True),
+        Attempt(user_id=users[2].id, puzzle_id=puzzle.id, moves=["right"], is_valid=True,
+                completion_time=500, completed_at=NOW),
+    ])
+    db.commit()
+
+    index = LeaderboardIndex()
+    assert index.sync(db, NOW) == 1
+    assert [entry.username for entry in index.top("daily", puzzle.id, 10, NOW)] == ["user0"]
+
+def test_index_first_sync_reads_only_bests_and_current_week(db, user, add_puzzle):
+    """Test that the first sync skips slower old attempts and counts moves without a stored move_count."""
+    puzzle = add_puzzle([["S", ".", "E"]], [0, 0], [0, 2])
+    old = NOW - timedelta(days=30)
+    best = Attempt(user_id=user.id, puzzle_id=puzzle.id, moves=["right", "right"], is_valid=True,
+                   completion_time=5, completed_at=old, analyzed_at=old)
+    slower = Attempt(user_id=user.id, puzzle_id=puzzle.id, moves=["right", "right"], move_count=2, is_valid=True,
+                     completion_time=9, completed_at=old, analyzed_at=old)
+    this_week = Attempt(user_id=user.id, puzzle_id=puzzle.id, moves=["right", "right"], move_count=2, is_valid=True,
+                        completion_time=7, completed_at=NOW, analyzed_at=NOW)
+    db.add_all([best, slower, this_week])
+    db.commit()
+
+    index = LeaderboardIndex()
+    assert index.sync(db, NOW) == 2
+    assert [(entry.completion_time, entry.total_moves) for entry in index.top("all", puzzle.id, 10, NOW)] == [(5, 2)]
+    assert [entry.completion_time for entry in index.top("weekly", puzzle.id, 10, NOW)] == [7]
+    assert index.rank("daily", None, user.id, NOW)[0] == 1
+
+def test_index_sync_reports_rolled_over_boards(db):
+    """Test that listeners hear about boards dropped at rollover even when nothing new was analyzed."""
+    index = LeaderboardIndex()
+    index.record(1, 7, 100, make_entry(5000), NOW)
+    notified = []
+    index.add_listener(notified.append)
+
+    index.sync(db, NOW + timedelta(days=1))
+    assert notified == [{("daily", 7), ("daily", None)}]
@@ -0,0 +1,42 @@
+import asyncio
+import pytest
+from live import Broadcaster
+
+### Unit Tests for the Live Leaderboard Broadcaster
+
+def test_publish_reaches_every_subscriber():
+    """Test that one published message is delivered to all subscribers of the topic only."""
+    async def scenario():
+        broadcaster = Broadcaster(buffer_size=4)
+        first = broadcaster.subscribe(("all", 1))
+        second = broadcaster.subscribe(("all", 1))
+        other = broadcaster.subscribe(("all", 2))
+        broadcaster.publish(("all", 1), "update")
+        await asyncio.sleep(0)
+        return first.queue.get_nowait(), second.queue.get_nowait(), other.queue.empty()
+
+    assert asyncio.run(scenario()) == ("update", "update", True)
+
+def test_slow_subscriber_is_dropped():
+    """Test that a full buffer disconnects the subscriber instead of blocking."""
+    async def scenario():
+        broadcaster = Broadcaster(buffer_size=2)
+        slow = broadcaster.subscribe(("daily", None))
+        for i in range(3):
+            broadcaster.publish(("daily", None), f"update {i}")
+        await asyncio.sleep(0)
+        return slow.queue.get_nowait(), broadcaster.has_subscribers(("daily", None))
+
+    assert asyncio.run(scenario()) == (None, False)
+
+def test_unsubscribe_stops_delivery():
+    """Test that publishing to a topic without subscribers is a no-op."""
+    async def scenario():
+        broadcaster = Broadcaster()
+        subscription = broadcaster.subscribe(("weekly", 3))
+        broadcaster.unsubscribe(subscription)
+        broadcaster.publish(("weekly", 3), "update")
+        await asyncio.sleep(0)
+        return subscription.queue.empty()
+
+    assert asyncio.run(scenario())
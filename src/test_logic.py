@@ -1,5 +1,5 @@
 import pytest
-from logic import validate_maze_solution
+from logic import validate_maze_solution, shortest_solution_length
 from unittest.mock import MagicMock
 
 ### Unit Tests for the Logic Module
@@ -128,4 +128,17 @@ def test_validate_maze_solution_with_portals():
     is_valid, message = validate_maze_solution(grid, start_pos, end_pos, portal_pairs, moves)
     print(is_valid, message)
     assert is_valid is True
-    assert "Congratulations!" in message
\ No newline at end of file
+    assert "Congratulations!" in message
+
+def test_shortest_solution_length():
+    """Test the optimal move count through keys, doors and portals."""
+    assert shortest_solution_length([["S", ".", "E"]], (0, 0), (0, 2), {}) == 2
+    assert shortest_solution_length([["S", "K", "D", "E"]], (0, 0), (0, 3), {}) == 3
+    assert shortest_solution_length([["S", "D", "K", "E"]], (0, 0), (0, 3), {}) is None
+
+    grid = [
+        ["S", ".", "P1"],
+        ["#", "#", "#"],
+        ["P1", ".", "E"]
+    ]
+    assert shortest_solution_length(grid, (0, 0), (2, 2), {1: [[0, 2], [2, 0]]}) == 4
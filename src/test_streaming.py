@@ -0,0 +1,104 @@
+import json
+import pytest
+from database import Attempt
+from streaming import MoveStreamParser
+import main
+
+### Unit Tests for Streaming Attempt Submission
+
+def parse_chunks(chunks):
+    parser = MoveStreamParser()
+    moves = []
+    for chunk in chunks:
+        moves.extend(parser.feed(chunk))
+    moves.extend(parser.close())
+    return moves
+
+def test_parser_handles_split_chunks():
+    """Test that moves split across arbitrary chunk boundaries are parsed."""
+    body = json.dumps({"moves": [{"action": "right", "timestamp": 1000}, {"action": "down", "timestamp": 2000}]})
+    body = body.encode()
+    for size in (1, 3, 7, len(body)):
+        chunks = [body[i:i + size] for i in range(0, len(body), size)]
+        assert parse_chunks(chunks) == [("right", 1000), ("down", 2000)]
+
+def test_parser_accepts_empty_moves():
+    """Test that an empty moves list parses to no moves."""
+    assert parse_chunks([b' { "moves" : [ ] } ']) == []
+
+@pytest.mark.parametrize("body", [
+    b'{"steps": []}',
+    b'{"moves": [{"action": "up", "timestamp": 1},]}',
+    b'{"moves": [{"action": "up", "timestamp": "1"}]}',
+    b'{"moves": [{"action": "up", "timestamp": 100000000000000000000}]}',
+    b'{"moves": [1]}',
+    b'{"moves": [{"action": "up", "timestamp": 1}]} trailing',
+    b'{"moves": [{"action": "up", "timestamp": 1}',
+])
+def test_parser_rejects_malformed_bodies(body):
+    """Test that malformed bodies raise ValueError."""
+    with pytest.raises(ValueError):
+        parse_chunks([body])
+
+@pytest.fixture
+def submission(client, session_factory, user, add_puzzle):
+    puzzle = add_puzzle([["S", ".", "E"]], [0, 0], [0, 2])
+    main.app.dependency_overrides[main.get_current_user] = lambda: user
+    main.app.dependency_overrides[main.limit_submissions] = lambda: None
+    return client, session_factory, puzzle.id
+
+def test_stream_submission_valid(submission):
+    """Test a streamed solution that reaches the goal."""
+    test_client, factory, puzzle_id = submission
+    body = {"moves": [{"action": "right", "timestamp": 1000}, {"action": "right", "timestamp": 1800}]}
+    response = test_client.post(f"/puzzles/{puzzle_id}/attempt/stream", content=json.dumps(body))
+    assert response.status_code == 200
+    assert response.json()["is_valid"] is True
+    assert response.json()["completion_time"] == 800
+
+    db = factory()
+    attempt = db.query(Attempt).one()
+    assert attempt.moves == ["right", "right"]
+    assert attempt.move_timestamps == [1000, 1800]
+    db.close()
+
+def test_stream_submission_stops_at_invalid_move(submission):
+    """Test that the first invalid move ends the attempt."""
+    test_client, factory, puzzle_id = submission
+    body = {"moves": [{"action": "up", "timestamp": 1000}, {"action": "right", "timestamp": 2000}]}
+    response = test_client.post(f"/puzzles/{puzzle_id}/attempt/stream", content=json.dumps(body))
+    assert response.json()["is_valid"] is False
+    assert response.json()["total_moves"] == 1
+
+def test_stream_submission_stores_unknown_action_verbatim(submission):
+    """Test that an unknown action is stored as sent, the same as the buffered endpoint."""
+    test_client, factory, puzzle_id = submission
+    body = {"moves": [{"action": "right", "timestamp": 1000}, {"action": "jump", "timestamp": 2000}]}
+    response = test_client.post(f"/puzzles/{puzzle_id}/attempt/stream", content=json.dumps(body))
+    assert response.json()["is_valid"] is False
+    assert response.json()["total_moves"] == 2
+
+    db = factory()
+    assert db.query(Attempt).one().moves == ["right", "jump"]
+    db.close()
+
+def test_stream_submission_rejects_malformed_body(submission):
+    """Test that malformed bodies are rejected with 422."""
+    test_client, _, puzzle_id = submission
+    response = test_client.post(f"/puzzles/{puzzle_id}/attempt/stream", content=b'{"moves": [oops]}')
+    assert response.status_code == 422
+
+def test_stream_submission_rejects_out_of_range_timestamp(submission):
+    """Test that a timestamp too large to store is a 422, not a server error."""
+    test_client, _, puzzle_id = submission
+    body = {"moves": [{"action": "right", "timestamp": 10 ** 20}]}
+    response = test_client.post(f"/puzzles/{puzzle_id}/attempt/stream", content=json.dumps(body))
+    assert response.status_code == 422
+
+def test_stream_submission_enforces_size_limit(submission, monkeypatch):
+    """Test that oversized bodies are rejected with 413."""
+    test_client, _, puzzle_id = submission
+    monkeypatch.setattr(main, "STREAM_MAX_BODY_BYTES", 10)
+    body = {"moves": [{"action": "right", "timestamp": 1000}]}
+    response = test_client.post(f"/puzzles/{puzzle_id}/attempt/stream", content=json.dumps(body))
+    assert response.status_code == 413
@@ -0,0 +1,93 @@
+import threading
+import time
+import pytest
+from fastapi import HTTPException
+from throttling import SingleFlight, TokenBucketLimiter, parse_rate
+import main
+
+### Unit Tests for Request Coalescing and Rate Limiting
+
+def test_single_flight_shares_one_call():
+    """Test that concurrent calls with the same key run the function once."""
+    flight = SingleFlight()
+    calls = []
+    started = threading.Event()
+
+    def slow_query():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return "result"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("key", slow_query)))
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=lambda: results.append(flight.do("key", slow_query))) for _ in range(5)]
+    for thread in followers:
+        thread.start()
+    for thread in [leader] + followers:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ["result"] * 6
+
+def test_single_flight_does_not_cache():
+    """Test that a completed call is run again by the next caller."""
+    flight = SingleFlight()
+    calls = []
+    flight.do("key", lambda: calls.append(1))
+    flight.do("key", lambda: calls.append(1))
+    assert len(calls) == 2
+
+def test_single_flight_propagates_errors():
+    """Test that errors reach the caller and clear the in-flight entry."""
+    flight = SingleFlight()
+
+    def failing():
+        raise HTTPException(status_code=404, detail="Puzzle not found")
+
+    with pytest.raises(HTTPException):
+        flight.do("key", failing)
+    assert flight.do("key", lambda: "ok") == "ok"
+
+def test_parse_rate():
+    """Test parsing of "<requests>/<seconds>" limits."""
+    assert parse_rate("10/60") == (10, 10 / 60)
+
+@pytest.mark.parametrize("rate", ["0/60", "10/0", "-1/60", "10", "ten/60"])
+def test_parse_rate_rejects_invalid_limits(rate):
+    """Test that limits which would never refill or divide by zero are refused."""
+    with pytest.raises(ValueError):
+        parse_rate(rate)
+
+def test_token_bucket_limits_per_key():
+    """Test that each key gets its own burst and is then refused."""
+    limiter = TokenBucketLimiter("2/60")
+    assert limiter.acquire("alice") == 0
+    assert limiter.acquire("alice") == 0
+    assert limiter.acquire("alice") > 0
+    assert limiter.acquire("bob") == 0
+
+    with pytest.raises(HTTPException) as error:
+        limiter.check("alice")
+    assert error.value.status_code == 429
+    assert "Retry-After" in error.value.headers
+
+def test_token_bucket_refills():
+    """Test that tokens come back over time."""
+    limiter = TokenBucketLimiter("1/0.05")
+    assert limiter.acquire("alice") == 0
+    assert limiter.acquire("alice") > 0
+    time.sleep(0.06)
+    assert limiter.acquire("alice") == 0
+
+def test_login_limited_per_username_and_ip(client, monkeypatch):
+    """Test that repeated logins for one username from one IP are refused without locking out other IPs."""
+    monkeypatch.setattr(main, "login_user_limiter", TokenBucketLimiter("1/60"))
+    assert client.post("/auth/login", json={"username": "victim", "password": "guess1"}).status_code == 401
+    assert client.post("/auth/login", json={"username": "victim", "password": "guess2"}).status_code == 429
+    assert client.post("/auth/login", json={"username": "other", "password": "guess"}).status_code == 401
+
+    monkeypatch.setattr(main, "client_ip", lambda request: "203.0.113.7")
+    assert client.post("/auth/login", json={"username": "victim", "password": "guess3"}).status_code == 401
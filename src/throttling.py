@@ -0,0 +1,124 @@
+import os
+import threading
+import time
+from typing import Callable, Dict, Hashable, Tuple
+
+from fastapi import HTTPException, Request
+
+def parse_rate(rate: str) -> Tuple[int, float]:
+    """Parse a "<requests>/<seconds>" limit into (bucket capacity, tokens refilled per second)"""
+    try:
+        requests, seconds = rate.split("/")
+        requests, seconds = int(requests), float(seconds)
+    except ValueError:
+        raise ValueError(f"Invalid rate limit {rate!r}, expected \"<requests>/<seconds>\"")
+    if requests <= 0 or seconds <= 0:
+        raise ValueError(f"Invalid rate limit {rate!r}, requests and seconds must be positive")
+    return requests, requests / seconds
+
+# Limits are "<requests>/<seconds>"; a client may burst up to <requests> at once
+SUBMIT_USER_RATE = os.getenv("RATE_LIMIT_SUBMIT_USER", "30/60")
+SUBMIT_IP_RATE = os.getenv("RATE_LIMIT_SUBMIT_IP", "120/60")
+AUTH_IP_RATE = os.getenv("RATE_LIMIT_AUTH_IP", "10/60")
+# Login attempts against one username from one IP; keyed on both so nobody can lock another user out
+AUTH_USER_RATE = os.getenv("RATE_LIMIT_AUTH_USER", "5/60")
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it is
+    in flight wait and receive the same result (or exception). Nothing is cached
+    once the call completes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, "_Call"] = {}
+
+    def do(self, key: Hashable, fn: Callable):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class TokenBucketLimiter:
+    """In-process token buckets keyed by client (user id or IP)"""
+
+    # Idle buckets are pruned once this many keys are tracked
+    MAX_KEYS = 100_000
+
+    def __init__(self, rate: str):
+        self.capacity, self.refill_rate = parse_rate(rate)
+        self._buckets: Dict[Hashable, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key: Hashable) -> float:
+        """Take one token for key. Returns 0 on success, otherwise seconds until a token is available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated) * self.refill_rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                if len(self._buckets) > self.MAX_KEYS:
+                    self._prune(now)
+                return 0
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / self.refill_rate
+
+    def _prune(self, now: float):
+        """Drop buckets that would have refilled completely; they behave the same as new ones"""
+        full_after = self.capacity / self.refill_rate
+        self._buckets = {
+            key: (tokens, updated) for key, (tokens, updated) in self._buckets.items()
+            if now - updated < full_after
+        }
+
+    def check(self, key: Hashable):
+        retry_after = self.acquire(key)
+        if retry_after:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests",
+                headers={"Retry-After": str(int(retry_after) + 1)}
+            )
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+def ip_rate_limit(limiter: TokenBucketLimiter):
+    """Build a dependency that rate limits by the caller's IP address"""
+    def dependency(request: Request):
+        limiter.check(client_ip(request))
+    return dependency
+
+submit_user_limiter = TokenBucketLimiter(SUBMIT_USER_RATE)
+submit_ip_limiter = TokenBucketLimiter(SUBMIT_IP_RATE)
+auth_ip_limiter = TokenBucketLimiter(AUTH_IP_RATE)
+login_user_limiter = TokenBucketLimiter(AUTH_USER_RATE)
+read_coalescer = SingleFlight()